@@ -1,21 +1,119 @@
 import logging
 import datetime
+import time
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.update_coordinator import UpdateFailed
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
 from datetime import timedelta
 from .const import DOMAIN
-from .api import KsemClient
+from .commands import KsemChargeModeQueue
+from .api import EMOBILITY_CONFIG_PREFIX, EVSE_LIST_MAX_AGE, EVSE_LIST_PATH, KsemClient
+from .coordinator import AdaptivePollInterval, KsemCoordinator, KsemModbusCoordinator
+from .gdr import KsemGdrStream
+from .helper import LogThrottle, evse_state_available
+from .history import HISTORY_SECONDS, KsemHistory
+from .websocket import CHARGEMODE_PATH, EVSE_STATE_PATH, KsemWebSocketHub
 from .modbus_helper import KsemModbusClient
+from .modbus_map import SENSOR_DEFINITIONS
+from .scheduler import SCHEDULER_KEY, KsemPollScheduler
+from .snapshot import SLOT_NAMES, SLOTS
 import asyncio
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["sensor", "number", "select", "switch"]
+IDENTITY_KEYS = ("Mac", "Serial", "ProductName", "FirmwareVersion", "DeviceType")
+# REST-Abgleich der Wallbox: normal 30 s, bei aktivem State-Stream nur noch selten
+WALLBOX_POLL_INTERVAL = datetime.timedelta(seconds=30)
+WALLBOX_RECONCILE_INTERVAL = datetime.timedelta(minutes=5)
+
+SERVICE_GET_HISTORY = "get_history"
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("sensors"): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("seconds", default=300): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=HISTORY_SECONDS)
+        ),
+        vol.Optional("resolution"): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+def _build_device_info(info: dict, host: str) -> DeviceInfo:
+    return DeviceInfo(
+        identifiers={(DOMAIN, info.get("Serial"))},
+        connections={(CONNECTION_NETWORK_MAC, info.get("Mac"))},
+        name="Smartmeter",
+        manufacturer="Kostal",
+        model=info.get("ProductName"),
+        hw_version=info.get("DeviceType"),
+        sw_version=info.get("FirmwareVersion"),
+        configuration_url=f"http://{host}",
+    )
+
+
+def _wallbox_identity(data) -> list:
+    """Stammdaten der erreichbaren Wallboxen (ohne Live-Werte/State) für den Cache."""
+    result = []
+    for wb in (data or {}).get("evse") or []:
+        if not wb.get("available"):
+            continue
+        details = wb.get("details") or {}
+        result.append(
+            {
+                "uuid": wb.get("uuid"),
+                "label": wb.get("label"),
+                "model": wb.get("model"),
+                "details": {
+                    "serial": details.get("serial"),
+                    "version": details.get("version"),
+                },
+            }
+        )
+    return result
+
+
+def _history_response(history: KsemHistory, call: ServiceCall) -> dict:
+    """Rohwerte bzw. min/max/mean-Fenster der angefragten Sensoren."""
+    now = time.time()
+    since = now - call.data["seconds"]
+    resolution = call.data.get("resolution")
+    names = call.data.get("sensors") or [SLOT_NAMES[slot] for slot in history.slots]
+    result = {}
+    for name in names:
+        slot = SLOTS.get(name)
+        if slot not in history.slots:
+            raise ServiceValidationError(f"Keine History für Sensor '{name}'")
+        if resolution:
+            result[name] = history.buckets(slot, since, now, resolution)
+        else:
+            result[name] = [
+                {"time": timestamp, "value": value}
+                for timestamp, value in history.samples(slot, since)
+            ]
+    return result
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    async def _get_history(call: ServiceCall) -> dict:
+        entries = hass.data.get(DOMAIN, {})
+        entry_id = call.data.get("entry_id") or next(iter(entries), None)
+        if entry_id not in entries:
+            raise ServiceValidationError(f"Unbekannter Eintrag: {entry_id}")
+        return _history_response(entries[entry_id]["history"], call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
     return True
 
 
@@ -25,8 +123,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     host = entry.data["host"]
     password = entry.data["password"]
-    client = KsemClient(hass, host, password)
+    # Ein Takt für alle Einträge: Polls verteilt, Geräte-I/O global begrenzt
+    scheduler = hass.data.get(SCHEDULER_KEY)
+    if scheduler is None:
+        scheduler = hass.data[SCHEDULER_KEY] = KsemPollScheduler()
+    entry.async_on_unload(scheduler.register(entry.entry_id))
+    client = KsemClient(hass, host, password, limiter=scheduler.host_limit(host))
     modbus_client = KsemModbusClient(host)
+    # Eine WebSocket-Verbindung je Stream für alle Entities dieses Entries
+    ws_hub = KsemWebSocketHub(hass, entry, client)
 
     async def _update_smartmeter():
         try:
@@ -34,33 +139,26 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         except Exception as err:
             raise UpdateFailed(f"Smartmeter-Fehler: {err}")
 
+    # Wallbox/Zusatzinfos offline: nicht bei jedem Poll warnen
+    log = LogThrottle(_LOGGER)
+
     async def _update_wallbox():
         """Robuster WB-Update:
         - /evselist ist 'kritisch' (ohne Liste -> UpdateFailed)
         - /details ist 'best effort' (Fehler/Timeout -> WB marked unavailable, kein UpdateFailed)
         """
+        # State kommt per Push: Liste dann nur selten neu laden
+        max_age = EVSE_LIST_MAX_AGE if ws_hub.is_connected(EVSE_STATE_PATH) else 0
         try:
-            evse_list = await client.get_evse_list()
+            evse_list = await client.get_evse_list(max_age=max_age)
         except Exception as err:
             raise UpdateFailed(
                 f"EVSE-Liste konnte nicht geladen werden: {err}"
             ) from err
 
-        result = []
-        for evse in evse_list or []:
-            # Kopie und Basisfelder
-            wb = dict(evse)
-            uuid = wb.get("uuid")
-            state = (wb.get("state") or "").lower()
-
-            # Wenn evselist bereits einen Kommunikationsfehler signalisiert, Details überspringen
-            if "commerror" in state or "error" in state or "offline" in state:
-                wb["available"] = False
-                wb["details"] = None
-                result.append(wb)
-                continue
-
+        async def _load_details(wb: dict):
             # Details mit Timeout 'best effort'
+            uuid = wb.get("uuid")
             try:
                 details = await asyncio.wait_for(
                     client.get_evse_details(uuid), timeout=5.0
@@ -68,33 +166,46 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 wb["available"] = True
                 wb["details"] = details
                 wb.update(details or {})
+                log.clear(uuid)
             except Exception as err:
-                _LOGGER.warning(
-                    "Wallbox-Details für %s nicht erreichbar: %s", uuid, err
+                log.warning(
+                    uuid, "Wallbox-Details für %s nicht erreichbar: %s", uuid, err
                 )
                 wb["available"] = False
                 wb["details"] = None
+
+        async def _optional(fetch, default, what: str):
+            # optionale Zusatzinfos sind nicht kritisch
+            try:
+                result = await fetch()
+            except Exception as err:
+                log.warning(what, "%s konnte nicht geladen werden: %s", what, err)
+                return default
+            log.clear(what)
+            return result
+
+        result = []
+        detail_jobs = []
+        for evse in evse_list or []:
+            # Kopie und Basisfelder
+            wb = dict(evse)
             result.append(wb)
 
-        # optionale Zusatzinfos sind nicht kritisch
-        try:
-            res = await client.get_phase_switching()
-            phase_usage = res.get("phase_usage", 0)
-        except Exception as err:
-            _LOGGER.warning("Phasenumschaltung konnte nicht geladen werden: %s", err)
-            phase_usage = 0
-        try:
-            config = await client.get_energyflow_config()
-        except Exception as err:
-            _LOGGER.warning(
-                "Energiefluss-Konfiguration konnte nicht geladen werden: %s", err
-            )
-            config = {}
-        try:
-            evse_state = await client.get_evse_state()
-        except Exception as err:
-            _LOGGER.warning("EVSE-Status konnte nicht geladen werden: %s", err)
-            evse_state = {}
+            # Wenn evselist bereits einen Kommunikationsfehler signalisiert, Details überspringen
+            if not evse_state_available(wb.get("state")):
+                wb["available"] = False
+                wb["details"] = None
+                continue
+            detail_jobs.append(_load_details(wb))
+
+        # Details aller Wallboxen und Zusatzinfos parallel (begrenzt je Host im Client)
+        res, config, evse_state, *_ = await asyncio.gather(
+            _optional(client.get_phase_switching, {}, "Phasenumschaltung"),
+            _optional(client.get_energyflow_config, {}, "Energiefluss-Konfiguration"),
+            _optional(client.get_evse_state, {}, "EVSE-Status"),
+            *detail_jobs,
+        )
+        phase_usage = (res or {}).get("phase_usage", 0)
 
         return {
             "evse": result,  # Liste kann leer sein -> System ohne Wallbox
@@ -105,59 +216,196 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     async def _update_modbus():
         try:
-            return await modbus_client.read_all()  # liest das komplette Mapping
+            return await modbus_client.read_due()  # liest nur fällige poll_tiers
         except Exception as err:
             raise UpdateFailed(f"Modbus-Fehler: {err}")
 
-    smart_coordinator = DataUpdateCoordinator(
+    smart_coordinator = KsemCoordinator(
         hass,
         _LOGGER,
+        scheduler=scheduler,
+        entry_id=entry.entry_id,
+        lane=0,
         name="ksem_smartmeter",
         update_method=_update_smartmeter,
         update_interval=datetime.timedelta(seconds=30),
     )
-    wallbox_coordinator = DataUpdateCoordinator(
+    wallbox_coordinator = KsemCoordinator(
         hass,
         _LOGGER,
+        scheduler=scheduler,
+        entry_id=entry.entry_id,
+        lane=1,
         name="ksem_wallbox",
         update_method=_update_wallbox,
-        update_interval=datetime.timedelta(seconds=30),
+        update_interval=WALLBOX_POLL_INTERVAL,
     )
-    modbus_coordinator = DataUpdateCoordinator(
+
+    def _cpu_load():
+        try:
+            return float((smart_coordinator.data or {})["CpuLoad"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    # Rohwerte der schnellen Register (1 s) im Speicher, veröffentlicht wird der Mittelwert
+    history = KsemHistory()
+    modbus_coordinator = KsemModbusCoordinator(
         hass,
         _LOGGER,
+        scheduler=scheduler,
+        entry_id=entry.entry_id,
+        lane=2,
+        history=history,
+        # History braucht 1-s-Rohwerte: nur Fehler und CPU-Last verlängern das Intervall
+        adaptive=AdaptivePollInterval(
+            minimum=modbus_client.poll_interval, quiet_backoff=False
+        ),
+        cpu_load=_cpu_load,
+        deadbands={
+            spec["name"]: spec["deadband"]
+            for spec in SENSOR_DEFINITIONS.values()
+            if "deadband" in spec
+        },
         name="ksem_modbus_all",
         update_method=_update_modbus,
-        update_interval=datetime.timedelta(seconds=10),
+        update_interval=datetime.timedelta(seconds=modbus_client.poll_interval),
     )
 
-    await smart_coordinator.async_refresh()
-    await wallbox_coordinator.async_refresh()
-    await modbus_coordinator.async_refresh()
+    def _save_identity(info: dict | None = None):
+        """Persistiert Geräte- und Wallbox-Identität für einen schnellen Neustart."""
+        old = entry.data.get("identity") or {}
+        device = {key: (info or {}).get(key) for key in IDENTITY_KEYS}
+        if not device.get("Serial"):
+            device = old.get("device") or device
+        evse = _wallbox_identity(wallbox_coordinator.data) or old.get("evse") or []
+        identity = {"device": device, "evse": evse}
+        if identity != old:
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, "identity": identity}
+            )
+
+    async def _refresh_identity():
+        """Holt die Geräteinfos im Hintergrund und gleicht Cache/Registry ab."""
+        try:
+            fresh = await client.get_device_info()
+        except Exception as err:
+            _LOGGER.warning("Geräteinformationen nicht abrufbar, nutze Cache: %s", err)
+            return
+        _save_identity(fresh)
+        device = dr.async_get(hass).async_get_device(
+            identifiers={(DOMAIN, fresh.get("Serial"))}
+        )
+        if device:
+            dr.async_get(hass).async_update_device(
+                device.id,
+                model=fresh.get("ProductName"),
+                hw_version=fresh.get("DeviceType"),
+                sw_version=fresh.get("FirmwareVersion"),
+            )
+
+    coordinators = (smart_coordinator, wallbox_coordinator, modbus_coordinator)
+    identity = entry.data.get("identity")
+    if identity and identity.get("device", {}).get("Serial"):
+        # Neustart: Plattformen sofort aus der gespeicherten Identität, Daten kommen nach
+        info = identity["device"]
+        if identity.get("evse"):
+            wallbox_coordinator.data = {
+                "evse": [dict(wb, available=False) for wb in identity["evse"]]
+            }
+        for coordinator in coordinators:
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{coordinator.name} refresh"
+            )
+        entry.async_create_background_task(
+            hass, _refresh_identity(), "ksem device info"
+        )
+    else:
+        # Erstinstallation: erste Abrufe und Geräteinfos parallel
+        try:
+            *_, info = await asyncio.gather(
+                *(coordinator.async_refresh() for coordinator in coordinators),
+                client.get_device_info(),
+            )
+        except Exception as err:
+            await modbus_client.disconnect()
+            raise ConfigEntryNotReady(
+                f"Geräteinformationen nicht abrufbar: {err}"
+            ) from err
+        _save_identity(info)
+
+    entry.async_on_unload(wallbox_coordinator.async_add_listener(_save_identity))
 
-    info = await client.get_device_info()
-    mac = info.get("Mac")
     serial = info.get("Serial")
-    model = info.get("ProductName")
-    fw = info.get("FirmwareVersion")
-    hw = info.get("DeviceType")
+    device_info = _build_device_info(info, host)
 
-    device_info = DeviceInfo(
-        identifiers={(DOMAIN, serial)},
-        connections={(CONNECTION_NETWORK_MAC, mac)},
-        name="Smartmeter",
-        manufacturer="Kostal",
-        model=model,
-        hw_version=hw,
-        sw_version=fw,
-        configuration_url=f"http://{host}",
+    # Live-Werte der Wallbox per Push; REST-Polling bleibt für Stammdaten/Recovery
+    gdr_stream = KsemGdrStream(hass, entry.entry_id)
+    entry.async_on_unload(gdr_stream.attach(ws_hub))
+
+    def _cache_chargemode(topic: str, msg: dict):
+        # Letzten Stand für set_charge_mode und neue Entities zwischenspeichern
+        hass.data[DOMAIN][entry.entry_id]["last_chargemode"] = msg
+        # E-Mobility-Konfiguration wurde geändert: zwischengespeicherte Werte verwerfen
+        client.invalidate_cache(EMOBILITY_CONFIG_PREFIX)
+
+    entry.async_on_unload(ws_hub.subscribe(CHARGEMODE_PATH, _cache_chargemode))
+
+    # Lademodus/Quoten: Änderungen gebündelt schreiben; der Stream meldet Geräteänderungen
+    chargemode_queue = KsemChargeModeQueue(hass, entry, client)
+    entry.async_on_unload(
+        ws_hub.subscribe(CHARGEMODE_PATH, chargemode_queue.handle_chargemode)
+    )
+
+    def _apply_evse_state(topic: str, msg: dict):
+        """State-Events der Wallbox sofort in die Coordinator-Daten übernehmen."""
+        uuid = msg.get("evse-id") or topic.split("/")[3]
+        state = msg.get("state")
+        data = wallbox_coordinator.data
+        if not state or not data:
+            return
+        evse = []
+        changed = reload_details = False
+        for wb in data.get("evse") or []:
+            if wb.get("uuid") == uuid and wb.get("state") != state:
+                available = evse_state_available(state)
+                reload_details = available and not wb.get("details")
+                wb = {**wb, "state": state, "available": available}
+                changed = True
+            evse.append(wb)
+        if not changed:
+            return
+        _LOGGER.debug("Wallbox %s: State %s (Push)", uuid, state)
+        # zwischengespeicherte /evselist enthält den alten State: sonst setzt der
+        # nächste Refresh innerhalb von EVSE_LIST_MAX_AGE den Push wieder zurück
+        client.invalidate_cache(EVSE_LIST_PATH)
+        wallbox_coordinator.async_set_updated_data({**data, "evse": evse})
+        if reload_details:
+            # Wallbox wieder erreichbar: Details (evtl. neue Firmware) per REST nachladen
+            hass.async_create_task(wallbox_coordinator.async_request_refresh())
+
+    def _evse_stream_status(connected: bool):
+        # Mit Push genügt ein seltener REST-Abgleich; ohne sofort zurück auf 30 s
+        if connected:
+            wallbox_coordinator.update_interval = WALLBOX_RECONCILE_INTERVAL
+        else:
+            wallbox_coordinator.update_interval = WALLBOX_POLL_INTERVAL
+            client.invalidate_cache(EVSE_LIST_PATH)  # State nicht mehr aktuell
+            hass.async_create_task(wallbox_coordinator.async_request_refresh())
+
+    entry.async_on_unload(
+        ws_hub.subscribe(EVSE_STATE_PATH, _apply_evse_state, _evse_stream_status)
     )
 
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
+        "modbus_client": modbus_client,
+        "ws_hub": ws_hub,
+        "gdr_stream": gdr_stream,
+        "chargemode_queue": chargemode_queue,
         "smart_coordinator": smart_coordinator,
         "wallbox_coordinator": wallbox_coordinator,
         "modbus_coordinator": modbus_coordinator,
+        "history": history,
         "device_info": device_info,
         "serial": serial,
     }
@@ -174,5 +422,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         ]
     )
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["ws_hub"].async_stop()
+        await data["modbus_client"].disconnect()
     return unload_ok
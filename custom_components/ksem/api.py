@@ -1,9 +1,13 @@
+import asyncio
+import contextlib
 import logging
 import datetime
+import time
 from typing import Union
 from aiohttp import ClientResponse
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .helper import bearer_header
+from .stats import RestStats
 from homeassistant.components.sensor import (
     SensorEntity,
     SensorDeviceClass,
@@ -30,17 +34,126 @@ class InvalidAuth(Exception):
     """Fehlerhafte Authentifizierung"""
 
 
+# Token wird so lange vor Ablauf proaktiv im Hintergrund erneuert
+TOKEN_REFRESH_MARGIN = datetime.timedelta(seconds=60)
+
+
+class TokenManager:
+    """Teilt einen laufenden Login unter allen Aufrufern (single flight).
+
+    Läuft der Token bald ab, wird er im Hintergrund erneuert, während die
+    Aufrufer den noch gültigen Token weiterverwenden.
+    """
+
+    def __init__(self, login) -> None:
+        self._login = login
+        self.token: Tokens | None = None
+        self._pending: asyncio.Task | None = None
+
+    def _refresh(self) -> asyncio.Task:
+        if self._pending is None:
+            self._pending = asyncio.get_running_loop().create_task(self._run())
+            self._pending.add_done_callback(self._done)
+        return self._pending
+
+    async def _run(self) -> Tokens:
+        self.token = await self._login()
+        return self.token
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._pending = None
+        if not task.cancelled() and task.exception():
+            _LOGGER.debug("Token-Erneuerung fehlgeschlagen: %s", task.exception())
+
+    async def async_get(self) -> Tokens:
+        token = self.token
+        now = datetime.datetime.now()
+        if token and now < token.expire_date - TOKEN_REFRESH_MARGIN:
+            return token
+        task = self._refresh()
+        if token and now < token.expire_date:
+            return token  # noch gültig, Erneuerung läuft im Hintergrund
+        return await asyncio.shield(task)
+
+    async def async_invalidate(self, stale: Tokens | None) -> Tokens:
+        """Nach 401 neu anmelden – nur einmal für alle Aufrufer mit demselben Token."""
+        if self.token is not None and self.token is not stale:
+            return self.token
+        self.token = None
+        return await asyncio.shield(self._refresh())
+
+
+# Cache-Dauer (Sekunden) für Endpunkte, die sich nur bei Benutzeränderungen ändern
+CONFIG_MAX_AGE = 300
+# /evselist bei State-Push: deutlich kürzer als der REST-Abgleich (5 min), damit
+# jeder planmäßige Abgleich frisch lädt und nur Zusatz-Refreshes den Cache nutzen
+EVSE_LIST_MAX_AGE = 60
+# Pfade, die bei Schreibzugriffen bzw. Konfigurations-Events verworfen werden
+ENERGYFLOW_CONFIG_PATH = "/api/kostal-energyflow/configuration"
+PHASE_SWITCHING_PATH = "/api/e-mobility/config/phaseswitching"
+EVSE_LIST_PATH = "/api/e-mobility/evselist"
+EMOBILITY_CONFIG_PREFIX = "/api/e-mobility/config/"
+
+
+class _CachedResponse:
+    """Zwischengespeicherte GET-Antwort mit Validatoren für bedingte Requests."""
+
+    __slots__ = ("data", "fetched", "etag", "last_modified")
+
+    def __init__(self, data, etag: str | None, last_modified: str | None):
+        self.data = data
+        self.fetched = time.monotonic()
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
 class KsemClient:
     """Client für REST-Aufrufe an die KSEM API mit Token-Refresh"""
 
-    def __init__(self, hass, host: str, password: str) -> None:
+    def __init__(
+        self, hass, host: str, password: str, session=None, limiter=None
+    ) -> None:
         self.hass = hass
         self.host = host.rstrip("/")
         self.password = password
-        self.token: Tokens | None = None
+        # optional eigene Session (z. B. für tools/benchmark.py ohne HA)
+        self._own_session = session
+        # begrenzt gleichzeitige Requests an den Host (scheduler.host_limit)
+        self._limiter = limiter or contextlib.nullcontext()
+        self._tokens = TokenManager(self._login)
+        self.stats = RestStats()
+        self._cache: dict[str, _CachedResponse] = {}
         _LOGGER.debug("KsemClient initialisiert für Host %s", self.host)
 
-    async def _auth(self, session):
+    @property
+    def token(self) -> Tokens | None:
+        return self._tokens.token
+
+    async def async_get_token(self) -> Tokens:
+        """Gültiger Token; meldet sich bei Bedarf (einmalig für alle Aufrufer) an."""
+        return await self._tokens.async_get()
+
+    def session(self):
+        """aiohttp-Session für REST und WebSocket (eigene oder die von HA)."""
+        return self._own_session or async_get_clientsession(self.hass)
+
+    async def async_invalidate_token(self, stale: Tokens | None) -> Tokens:
+        """Verwirft einen abgelehnten/ablaufenden Token und meldet sich neu an."""
+        self.stats.reauths += 1
+        return await self._tokens.async_invalidate(stale)
+
+    async def _login(self) -> Tokens:
+        return await self._auth(self.session())
+
+    async def _auth(self, session) -> Tokens:
         url = f"http://{self.host}/api/web-login/token"
         data = {
             "grant_type": "password",
@@ -55,7 +168,7 @@ class KsemClient:
         token_data = await resp.json()
         if "error" in token_data:
             raise InvalidAuth("Unauthorized")
-        self.token = Tokens(
+        return Tokens(
             token_data["access_token"],
             token_data.get("token_type", ""),
             token_data.get("expires_in", 0),
@@ -64,66 +177,123 @@ class KsemClient:
     async def _put(
         self, path: str, data=None, json=None, headers=None, text_mode=False
     ) -> Union[dict, None]:
-        session = async_get_clientsession(self.hass)
-        if not self.token or datetime.datetime.now() > self.token.expire_date:
-            await self._auth(session)
+        session = self.session()
+        token = await self._tokens.async_get()
         url = f"http://{self.host}{path}"
-        default_headers = bearer_header(self.token.access_token)
+        default_headers = bearer_header(token.access_token)
         if headers:
             default_headers.update(headers)
 
         _LOGGER.debug("PUT %s - Data: %s", url, json or data)
-        resp = await session.put(url, headers=default_headers, data=data, json=json)
-        if resp.status in (401, 500):
-            _LOGGER.debug("Status %s, re-authenticating", resp.status)
-            await self._auth(session)
-            default_headers = bearer_header(self.token.access_token)
-            resp = await session.put(url, headers=default_headers, data=data, json=json)
-
-        if resp.status == 204:
-            return None
-        resp.raise_for_status()
-        return await (resp.text() if text_mode else resp.json())
+        timing = self.stats.endpoints[f"PUT {path}"]
+        async with self._limiter:
+            began = time.perf_counter()
+            try:
+                resp = await session.put(
+                    url, headers=default_headers, data=data, json=json
+                )
+                if resp.status == 401:
+                    _LOGGER.debug("Status %s, re-authenticating", resp.status)
+                    token = await self.async_invalidate_token(token)
+                    default_headers.update(bearer_header(token.access_token))
+                    self.stats.retries += 1
+                    resp = await session.put(
+                        url, headers=default_headers, data=data, json=json
+                    )
+
+                if resp.status == 204:
+                    timing.record(time.perf_counter() - began)
+                    return None
+                resp.raise_for_status()
+                body = await resp.read()
+                result = await (resp.text() if text_mode else resp.json())
+            except Exception:
+                timing.failed()
+                raise
+        timing.record(time.perf_counter() - began, len(body))
+        return result
+
+    def invalidate_cache(self, prefix: str = "") -> None:
+        """Verwirft zwischengespeicherte GET-Antworten, deren Pfad mit prefix beginnt."""
+        for path in [p for p in self._cache if p.startswith(prefix)]:
+            del self._cache[path]
 
-    async def _get(self, path: str) -> Union[dict, list]:
-        session = async_get_clientsession(self.hass)
-        if not self.token or datetime.datetime.now() > self.token.expire_date:
-            await self._auth(session)
+    async def _get(self, path: str, max_age: float = 0) -> Union[dict, list]:
+        """GET mit optionalem Zwischenspeicher.
+
+        Antworten jünger als max_age Sekunden kommen aus dem Cache (nicht
+        verändern!). Liefert das Gerät ETag/Last-Modified, wird danach bedingt
+        angefragt und ein 304 aus dem Cache beantwortet.
+        """
+        cached = self._cache.get(path)
+        if cached and time.monotonic() - cached.fetched < max_age:
+            self.stats.cache_hits += 1
+            return cached.data
+
+        session = self.session()
+        token = await self._tokens.async_get()
         url = f"http://{self.host}{path}"
-        headers = bearer_header(self.token.access_token)
+        conditional = cached.validators() if cached else {}
+        headers = {**bearer_header(token.access_token), **conditional}
         _LOGGER.debug("GET %s", url)
-        resp: ClientResponse = await session.get(url, headers=headers)
-        if resp.status in (401, 500):
-            _LOGGER.debug("Status %s, re-authenticating", resp.status)
-            await self._auth(session)
-            headers = bearer_header(self.token.access_token)
-            resp = await session.get(url, headers=headers)
-        resp.raise_for_status()
-        data = await resp.json()
+        timing = self.stats.endpoints[f"GET {path}"]
+        async with self._limiter:
+            began = time.perf_counter()
+            try:
+                resp: ClientResponse = await session.get(url, headers=headers)
+                if resp.status == 401:
+                    _LOGGER.debug("Status %s, re-authenticating", resp.status)
+                    token = await self.async_invalidate_token(token)
+                    headers = {**bearer_header(token.access_token), **conditional}
+                    self.stats.retries += 1
+                    resp = await session.get(url, headers=headers)
+                if resp.status == 304 and cached:
+                    timing.record(time.perf_counter() - began)
+                    self.stats.not_modified += 1
+                    cached.fetched = time.monotonic()
+                    return cached.data
+                resp.raise_for_status()
+                body = await resp.read()  # json() nutzt den gelesenen Body
+                data = await resp.json()
+            except Exception:
+                timing.failed()
+                raise
+        timing.record(time.perf_counter() - began, len(body))
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if max_age or etag or last_modified:
+            self._cache[path] = _CachedResponse(data, etag, last_modified)
         _LOGGER.debug("Daten erhalten: %s", data)
         return data
 
     async def get_device_status(self) -> dict:
-        _LOGGER.info("Hole Gerätestatus")
+        _LOGGER.debug("Hole Gerätestatus")
         return await self._get("/api/device-settings/deviceusage")
 
     async def get_device_info(self) -> dict:
-        _LOGGER.info("Hole Geräteinformationen")
+        _LOGGER.debug("Hole Geräteinformationen")
         return await self._get("/api/device-settings")
 
-    async def get_evse_list(self):
-        """Liefert die Liste aller Wallboxen (EVSE) mit UUID etc."""
-        _LOGGER.info("Hole Wallboxen-Liste")
-        return await self._get("/api/e-mobility/evselist")
+    async def get_evse_list(self, max_age: float = 0):
+        """Liefert die Liste aller Wallboxen (EVSE) mit UUID etc.
+
+        Enthält den State: nur zwischenspeichern (max_age), solange dieser per
+        WebSocket kommt.
+        """
+        _LOGGER.debug("Hole Wallboxen-Liste")
+        return await self._get(EVSE_LIST_PATH, max_age=max_age)
 
     async def get_evse_details(self, evse_id):
-        """Liefert Geräte-Details einer Wallbox."""
-        _LOGGER.info("Hole Wallbox-Details für ID %s", evse_id)
+        """Liefert Geräte-Details einer Wallbox.
+
+        Nicht zwischengespeichert: der Abruf dient zugleich als Erreichbarkeitsprüfung.
+        """
+        _LOGGER.debug("Hole Wallbox-Details für ID %s", evse_id)
         return await self._get("/api/evse-kostal/evse/" + evse_id + "/details")
 
     async def get_evse_state(self):
         """Liefert den aktuellen Status (z. B. charging) einer Wallbox."""
-        _LOGGER.info("Hole Wallbox-Status")
+        _LOGGER.debug("Hole Wallbox-Status")
         return await self._get("/api/e-mobility/state")
 
     async def set_charge_mode(
@@ -133,10 +303,6 @@ class KsemClient:
         minpvpowerquota: int | None = None,
         entry_id=None,
     ):
-        session = async_get_clientsession(self.hass)
-        await self._auth(session)
-        url = f"http://{self.host}/api/e-mobility/config/chargemode"
-
         # Hole aktuelle Werte aus dem WebSocket-Cache
         cache = (
             self.hass.data.get("ksem", {}).get(entry_id, {}).get("last_chargemode", {})
@@ -157,25 +323,27 @@ class KsemClient:
         payload["lastminpvpowerquota"] = payload["minpvpowerquota"]
         payload["controlledby"] = 0
 
-        headers = bearer_header(self.token.access_token)
-        _LOGGER.debug("PUT %s - Payload: %s", url, payload)
-        resp = await session.put(url, headers=headers, json=payload)
-        resp.raise_for_status()
+        await self._put(
+            "/api/e-mobility/config/chargemode", json=payload, text_mode=True
+        )
 
     async def get_phase_switching(self):
-        return await self._get("/api/e-mobility/config/phaseswitching")
+        return await self._get(PHASE_SWITCHING_PATH, max_age=CONFIG_MAX_AGE)
 
     async def set_phase_switching(self, phase_usage: int):
         # KSEM antwortet hier oft ohne JSON/Content-Type
-        return await self._put(
-            "/api/e-mobility/config/phaseswitching",
+        result = await self._put(
+            PHASE_SWITCHING_PATH,
             json={"phase_usage": phase_usage},
             text_mode=True,  # <— wichtig
         )
+        self.invalidate_cache(PHASE_SWITCHING_PATH)
+        self.invalidate_cache(EVSE_LIST_PATH)  # enthält phase_usage_state
+        return result
 
     async def get_energyflow_config(self):
-        _LOGGER.info("Hole Configdaten von Energiefluss")
-        return await self._get("/api/kostal-energyflow/configuration")
+        _LOGGER.debug("Hole Configdaten von Energiefluss")
+        return await self._get(ENERGYFLOW_CONFIG_PATH, max_age=CONFIG_MAX_AGE)
 
     async def set_battery_usage(self, enabled: bool):
         value = "true" if enabled else "false"
@@ -185,3 +353,4 @@ class KsemClient:
             headers={"Content-Type": "text/plain"},
             text_mode=True,
         )
+        self.invalidate_cache(ENERGYFLOW_CONFIG_PATH)
@@ -0,0 +1,128 @@
+"""Schreib-Warteschlange für Lademodus und Quoten (ein PUT für viele Änderungen)."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+CHARGEMODE_KEYS = ("mode", "minpvpowerquota", "mincharginpowerquota")
+# Änderungen so lange sammeln, bevor geschrieben wird (z. B. Slider ziehen)
+CHARGEMODE_DEBOUNCE_S = 0.5
+
+
+class KsemChargeModeQueue:
+    """Bündelt Änderungen an mode/minpvpowerquota/mincharginpowerquota je Eintrag.
+
+    Änderungen wirken sofort (optimistisch) auf state, werden nach einer kurzen
+    Sammelphase in einem PUT geschrieben und gelten mit dessen Erfolg als
+    bestätigt; bei einem Fehler gilt wieder der vorherige Stand. Spätere
+    Änderungen am Gerät kommen über den Charge-Mode-Stream. Es ist immer
+    höchstens ein PUT unterwegs; jeder PUT enthält den vollständigen Stand,
+    damit sich Zwischenwerte nicht gegenseitig überschreiben.
+    """
+
+    def __init__(
+        self,
+        hass,
+        entry,
+        client,
+        confirmed: dict | None = None,
+        debounce: float = CHARGEMODE_DEBOUNCE_S,
+    ):
+        self._hass = hass
+        self._entry = entry
+        self._client = client
+        self._debounce = debounce
+        self._confirmed: dict = dict(confirmed or {})  # laut Gerät (PUT oder WebSocket)
+        self._writing: dict = {}  # PUT läuft gerade
+        self._pending: dict = {}  # noch nicht geschrieben
+        self._batch: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def state(self) -> dict:
+        """Bestätigter Stand, überlagert von laufenden und wartenden Änderungen."""
+        return {**self._confirmed, **self._writing, **self._pending}
+
+    @callback
+    def add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Meldet Zustandsänderungen an Entities; liefert die Abmeldefunktion."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def _remove():
+            if update_callback in self._listeners:
+                self._listeners.remove(update_callback)
+
+        return _remove
+
+    @callback
+    def _notify(self):
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def handle_chargemode(self, topic: str, msg: dict) -> None:
+        """Änderung aus dem Charge-Mode-Stream übernehmen."""
+        self._confirmed = msg
+        self._notify()
+
+    async def async_set(self, **changes) -> None:
+        """Übernimmt Änderungen (None = unverändert) und wartet auf den PUT."""
+        changes = {
+            key: value
+            for key, value in changes.items()
+            if key in CHARGEMODE_KEYS and value is not None
+        }
+        if not changes:
+            return
+        self._pending.update(changes)
+        if self._batch is None:
+            self._batch = self._hass.loop.create_future()
+            self._batch.add_done_callback(_consume_exception)
+        batch = self._batch
+        self._notify()
+        if self._task is None or self._task.done():
+            self._task = self._entry.async_create_background_task(
+                self._hass, self._flush(), "ksem chargemode write"
+            )
+        await asyncio.shield(batch)
+
+    async def _flush(self):
+        while self._pending:
+            await asyncio.sleep(self._debounce)  # weitere Änderungen einsammeln
+            changes, self._pending = self._pending, {}
+            batch, self._batch = self._batch, None
+            state = {**self.state, **changes}
+            self._writing = changes
+            try:
+                await self._client.set_charge_mode(
+                    mode=state.get("mode"),
+                    minpvpowerquota=state.get("minpvpowerquota"),
+                    mincharginpowerquota=state.get("mincharginpowerquota"),
+                    entry_id=self._entry.entry_id,
+                )
+            except Exception as err:
+                _LOGGER.warning("Lademodus konnte nicht gesetzt werden: %s", err)
+                self._writing = {}
+                self._notify()
+                batch.set_exception(
+                    HomeAssistantError(f"Lademodus konnte nicht gesetzt werden: {err}")
+                )
+                continue
+            # 2xx: Gerät hat übernommen, auch ohne Echo (Stream getrennt)
+            self._confirmed = {**self._confirmed, **changes}
+            self._writing = {}
+            self._notify()
+            batch.set_result(None)
+
+
+def _consume_exception(future: asyncio.Future):
+    # Fehler werden den wartenden Aufrufern gemeldet; ohne Aufrufer nicht erneut loggen
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,241 @@
+"""Coordinator für die Modbus-Werte mit Änderungserkennung."""
+
+import datetime
+import logging
+import time
+from collections.abc import Callable
+
+from homeassistant.core import HassJob, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .history import DOWNSAMPLE_WINDOW_S, HISTORY_SLOTS, KsemHistory
+from .modbus_map import POLL_TIERS
+from .scheduler import KsemPollScheduler
+from .snapshot import SLOT_NAMES, SLOTS, ModbusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Adaptives Poll-Intervall: schnell bei schwankender Leistung, langsam bei Ruhe,
+# hoher CPU-Last des KSEM oder Timeouts
+ADAPTIVE_MIN_S = POLL_TIERS["fast"]
+ADAPTIVE_MAX_S = 10.0
+VOLATILE_W = 100.0  # Leistungsänderung je Poll, ab der sofort schnell gepollt wird
+STABLE_POLLS = 5  # ruhige Polls in Folge, bevor das Intervall wächst
+STABLE_FACTOR = 1.5
+FAILURE_FACTOR = 2.0
+CPU_LOAD_HIGH = 80.0  # % (CpuLoad aus deviceusage)
+CPU_LOAD_MIN_S = 5.0
+
+
+class AdaptivePollInterval:
+    """Leitet das nächste Poll-Intervall aus Wertänderung, CPU-Last und Fehlern ab.
+
+    Mit quiet_backoff=False bleibt es bei Ruhe auf minimum (z. B. solange die
+    History 1-s-Rohwerte braucht); dann verlängern nur Fehler und CPU-Last.
+    """
+
+    def __init__(
+        self,
+        minimum: float = ADAPTIVE_MIN_S,
+        maximum: float = ADAPTIVE_MAX_S,
+        slots: tuple = HISTORY_SLOTS,
+        quiet_backoff: bool = True,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slots = slots
+        self.quiet_backoff = quiet_backoff
+        self.interval = minimum
+        self._stable = 0
+        self._previous: ModbusSnapshot | None = None
+
+    def _change(self, snapshot: ModbusSnapshot) -> float:
+        """Größte Leistungsänderung gegenüber dem letzten Poll (NaN ignoriert)."""
+        if self._previous is None:
+            return 0.0
+        new = snapshot.raw
+        old = self._previous.raw
+        change = 0.0
+        for slot in self.slots:
+            delta = abs(new[slot] - old[slot])
+            if delta > change:  # NaN-Vergleich ist False
+                change = delta
+        return change
+
+    def succeeded(self, snapshot: ModbusSnapshot, cpu_load: float | None) -> float:
+        if not self.quiet_backoff:
+            self.interval = self.minimum  # nach Fehlern sofort zurück
+        elif self._change(snapshot) >= VOLATILE_W:
+            self.interval = self.minimum
+            self._stable = 0
+        else:
+            self._stable += 1
+            if self._stable >= STABLE_POLLS:
+                self._stable = 0
+                self.interval = min(self.maximum, self.interval * STABLE_FACTOR)
+        self._previous = snapshot
+        if cpu_load is not None and cpu_load >= CPU_LOAD_HIGH:
+            return max(self.interval, CPU_LOAD_MIN_S)
+        return self.interval
+
+    def failed(self) -> float:
+        self._stable = 0
+        self.interval = min(self.maximum, self.interval * FAILURE_FACTOR)
+        return self.interval
+
+    def as_dict(self) -> dict:
+        return {
+            "interval": round(self.interval, 1),
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "quiet_backoff": self.quiet_backoff,
+        }
+
+
+class KsemCoordinator(DataUpdateCoordinator):
+    """DataUpdateCoordinator im domainweiten Takt des KsemPollScheduler.
+
+    lane unterscheidet die Coordinators eines Eintrags, damit auch diese
+    nicht gleichzeitig pollen. Ohne scheduler verhält er sich wie üblich.
+    """
+
+    def __init__(
+        self,
+        hass,
+        logger,
+        *,
+        scheduler: KsemPollScheduler | None = None,
+        entry_id: str | None = None,
+        lane: int = 0,
+        **kwargs,
+    ):
+        super().__init__(hass, logger, **kwargs)
+        self._scheduler = scheduler
+        self._entry_id = entry_id
+        self._lane = lane
+        self._slot_job = HassJob(self._handle_refresh_interval, "ksem poll slot")
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        interval = self.update_interval
+        if self._scheduler is None or not interval:
+            super()._schedule_refresh()
+            return
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        now = self.hass.loop.time()
+        due = self._scheduler.next_slot(
+            self._entry_id, self._lane, interval.total_seconds(), now
+        )
+        # _unsub_refresh: wird von HA bei manuellem Refresh und Shutdown abgebrochen
+        self._unsub_refresh = async_call_later(self.hass, due - now, self._slot_job)
+
+    async def _async_update_data(self):
+        if self._scheduler is None:
+            return await super()._async_update_data()
+        async with self._scheduler.poll():
+            return await super()._async_update_data()
+
+
+class KsemModbusCoordinator(KsemCoordinator):
+    """Benachrichtigt nur Entities, deren Wert sich geändert hat.
+
+    Entities melden sich mit ihrem Sensornamen als Kontext an
+    (CoordinatorEntity(..., context=name)). Listener ohne Kontext werden
+    immer benachrichtigt, bei wechselnder Verfügbarkeit alle.
+
+    Mit history landen die Rohwerte der schnellen Slots im Ringpuffer; als
+    State wird für diese Slots nur der Mittelwert über publish_window Sekunden
+    veröffentlicht. Mit adaptive passt sich update_interval nach jedem Poll an;
+    cpu_load liefert die aktuelle CPU-Last des KSEM (oder None).
+    """
+
+    def __init__(
+        self,
+        hass,
+        logger,
+        *,
+        deadbands: dict | None = None,
+        history: KsemHistory | None = None,
+        publish_window: float = DOWNSAMPLE_WINDOW_S,
+        adaptive: AdaptivePollInterval | None = None,
+        cpu_load: Callable[[], float | None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(hass, logger, **kwargs)
+        self.adaptive = adaptive
+        self._cpu_load = cpu_load or (lambda: None)
+        self.history = history
+        self._publish_window = publish_window
+        self._next_publish = 0.0
+        self._means: dict = {}
+        # Deadband je Slot (Konfiguration je Sensorname)
+        self._deadbands = {
+            SLOTS[name]: value for name, value in (deadbands or {}).items()
+        }
+        self._published = ModbusSnapshot()  # zuletzt an die Entities gemeldete Werte
+        self._published_success: bool | None = None
+
+    def _set_interval(self, seconds: float):
+        interval = datetime.timedelta(seconds=seconds)
+        if interval != self.update_interval:
+            _LOGGER.debug("Modbus-Pollintervall jetzt %.1f s", seconds)
+            self.update_interval = interval
+
+    async def _async_update_data(self) -> ModbusSnapshot:
+        try:
+            snapshot = await super()._async_update_data()
+        except Exception:
+            if self.adaptive is not None:
+                self._set_interval(self.adaptive.failed())
+            raise
+        if self.adaptive is not None:
+            self._set_interval(self.adaptive.succeeded(snapshot, self._cpu_load()))
+        if self.history is None:
+            return snapshot
+        now = time.time()
+        self.history.append(now, snapshot)
+        if now >= self._next_publish:
+            self._next_publish = now + self._publish_window
+            self._means = self.history.means(now - self._publish_window)
+        values = snapshot.raw[:]
+        for slot, mean in self._means.items():
+            values[slot] = mean
+        return ModbusSnapshot(values)
+
+    def _changed_slots(self, data: ModbusSnapshot) -> list:
+        old = self._published.raw
+        new = data.raw
+        changed = []
+        for slot in data.changed_slots(self._published):
+            deadband = self._deadbands.get(slot)
+            if deadband and abs(new[slot] - old[slot]) < deadband:
+                continue  # NaN-Vergleiche sind False: Wechsel von/zu NaN zählt
+            changed.append(slot)
+        return changed
+
+    def async_update_listeners(self) -> None:
+        data = self.data if self.data is not None else ModbusSnapshot()
+        if self.last_update_success != self._published_success:
+            # Verfügbarkeit hat sich geändert: alle Entities neu schreiben
+            self._published_success = self.last_update_success
+            self._published = data  # Snapshots sind unveränderlich
+            super().async_update_listeners()
+            return
+        if not self.last_update_success:
+            return
+
+        changed = self._changed_slots(data)
+        if changed:
+            published = self._published.raw[:]
+            new = data.raw
+            for slot in changed:
+                published[slot] = new[slot]
+            self._published = ModbusSnapshot(published)
+
+        changed_names = {SLOT_NAMES[slot] for slot in changed}
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed_names:
+                update_callback()
@@ -0,0 +1,36 @@
+"""Diagnosedaten: Verbindungszustand, Laufzeit-Kennzahlen, Streams und die letzten Rohwerte."""
+
+import time
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .scheduler import SCHEDULER_KEY
+from .snapshot import SLOT_NAMES
+
+TO_REDACT = {"password"}
+# Rohwerte der letzten Sekunden je schnellem Sensor
+DIAGNOSTICS_SAMPLES_S = 60
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    data = hass.data[DOMAIN][entry.entry_id]
+    history = data["history"]
+    since = time.time() - DIAGNOSTICS_SAMPLES_S
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "modbus": data["modbus_client"].health.as_dict(),
+        "modbus_timings": data["modbus_client"].stats.as_dict(),
+        "modbus_interval": data["modbus_coordinator"].adaptive.as_dict(),
+        "rest": data["client"].stats.as_dict(),
+        "websocket": data["ws_hub"].as_dict(),
+        "scheduler": hass.data[SCHEDULER_KEY].as_dict(),
+        "history": history.as_dict(),
+        "samples": {
+            SLOT_NAMES[slot]: history.samples(slot, since) for slot in history.slots
+        },
+    }
@@ -0,0 +1,237 @@
+"""Protobuf-GDR-Stream der Wallbox-Live-Werte (siehe api.md)."""
+
+import logging
+import struct
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Stream-Pfad am WebSocket-Hub (ws://<host>/api/data-transfer/ws/<pfad>)
+GDR_PATH = "protobuf/gdr/local/values/+/evse"
+
+# Protobuf Wire-Types
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LEN = 2
+WIRE_FIXED32 = 5
+
+DOUBLE = struct.Struct("<d")
+FLOAT = struct.Struct("<f")
+
+# Live-Werte der Wallbox: OBIS-Code(s) -> Entity (Einheiten laut api.md)
+GDR_SENSORS = {
+    "voltage_l1": {
+        "name": "Live Voltage L1",
+        "obis": ("1-0:32.4.0*255", "1-0:32.7.0*255"),
+        "unit": "V",
+        "device_class": "voltage",
+    },
+    "voltage_l2": {
+        "name": "Live Voltage L2",
+        "obis": ("1-0:52.4.0*255", "1-0:52.7.0*255"),
+        "unit": "V",
+        "device_class": "voltage",
+    },
+    "voltage_l3": {
+        "name": "Live Voltage L3",
+        "obis": ("1-0:72.4.0*255", "1-0:72.7.0*255"),
+        "unit": "V",
+        "device_class": "voltage",
+    },
+    "current_l1": {
+        "name": "Live Current L1",
+        "obis": ("1-0:31.4.0*255", "1-0:31.7.0*255"),
+        "unit": "A",
+        "device_class": "current",
+    },
+    "current_l2": {
+        "name": "Live Current L2",
+        "obis": ("1-0:51.4.0*255", "1-0:51.7.0*255"),
+        "unit": "A",
+        "device_class": "current",
+    },
+    "current_l3": {
+        "name": "Live Current L3",
+        "obis": ("1-0:71.4.0*255", "1-0:71.7.0*255"),
+        "unit": "A",
+        "device_class": "current",
+    },
+    "power": {
+        "name": "Live Charging Power",
+        "obis": ("1-0:1.4.0*255", "1-0:1.7.0*255"),
+        "unit": "W",
+        "device_class": "power",
+    },
+}
+
+# OBIS-Code -> Schlüssel in GDR_SENSORS
+OBIS_INDEX = {obis: key for key, spec in GDR_SENSORS.items() for obis in spec["obis"]}
+
+
+def gdr_signal(entry_id: str) -> str:
+    """Dispatcher-Signal für neue GDR-Werte eines Config-Entries."""
+    return f"{DOMAIN}_{entry_id}_gdr"
+
+
+# ---------------------------------------------------------------------------
+# Protobuf-Decoder (nur Wire-Format, ohne generierten Code)
+# ---------------------------------------------------------------------------
+
+
+def _varint(buf, pos: int) -> tuple:
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _signed(value: int) -> int:
+    """int64 im Zweierkomplement (negative Werte kommen als 10-Byte-Varint)."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def iter_fields(buf):
+    """Liefert (Feldnummer, Wire-Type, Wert) eines Protobuf-Messages.
+
+    Längenbegrenzte Felder werden als memoryview ohne Kopie geliefert.
+    """
+    buf = memoryview(buf)
+    pos = 0
+    end = len(buf)
+    while pos < end:
+        tag, pos = _varint(buf, pos)
+        field, wire = tag >> 3, tag & 0x07
+        if wire == WIRE_VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire == WIRE_LEN:
+            size, pos = _varint(buf, pos)
+            if pos + size > end:
+                raise ValueError("Protobuf-Feld reicht über das Frame-Ende hinaus")
+            value = buf[pos : pos + size]
+            pos += size
+        elif wire == WIRE_FIXED64:
+            value = DOUBLE.unpack_from(buf, pos)[0]
+            pos += 8
+        elif wire == WIRE_FIXED32:
+            value = FLOAT.unpack_from(buf, pos)[0]
+            pos += 4
+        else:
+            raise ValueError(f"Nicht unterstützter Protobuf-Wire-Type {wire}")
+        yield field, wire, value
+
+
+def _map_entry(buf) -> tuple:
+    key = value = None
+    for field, wire, raw in iter_fields(buf):
+        if field == 1:
+            key = raw
+        elif field == 2:
+            value = _signed(raw) if wire == WIRE_VARINT else raw
+    return key, value
+
+
+def _obis_key(key) -> str:
+    """OBIS als Text; gepackte Codes (A,B,C,D,E,F je ein Byte) werden formatiert."""
+    if isinstance(key, int):
+        a, b, c, d, e, f = key.to_bytes(6, "big")
+        return f"{a}-{b}:{c}.{d}.{e}*{f}"
+    return bytes(key).decode()
+
+
+def decode_gdr(buf) -> dict:
+    """Dekodiert ein GDR (id, status, timestamp, values, flexValues)."""
+    gdr = {
+        "id": None,
+        "status": None,
+        "timestamp": None,
+        "values": {},
+        "flexValues": {},
+    }
+    for field, wire, raw in iter_fields(buf):
+        if field == 1:
+            gdr["id"] = bytes(raw).decode()
+        elif field == 2:
+            gdr["status"] = raw
+        elif field == 3:
+            # Unix-Sekunden oder google.protobuf.Timestamp {seconds, nanos}
+            if wire == WIRE_LEN:
+                raw = next((v for f, _, v in iter_fields(raw) if f == 1), None)
+            gdr["timestamp"] = raw
+        elif field == 4:
+            key, value = _map_entry(raw)
+            if key is not None:
+                gdr["values"][_obis_key(key)] = value
+        elif field == 5:
+            key, value = _map_entry(raw)
+            if key is not None:
+                # Aufbau der flexValues ist nicht dokumentiert: Rohdaten behalten
+                gdr["flexValues"][bytes(key).decode()] = (
+                    bytes(value) if isinstance(value, memoryview) else value
+                )
+    return gdr
+
+
+def iter_gdrs(buf):
+    """Liefert die GDRs eines GDRs-Frames (map<string, GDR>) nacheinander."""
+    for field, wire, raw in iter_fields(buf):
+        if field != 1 or wire != WIRE_LEN:
+            continue
+        key, value = _map_entry(raw)
+        if value is None:
+            continue
+        gdr = decode_gdr(value)
+        if not gdr["id"] and key is not None:
+            gdr["id"] = bytes(key).decode()
+        yield gdr
+
+
+# ---------------------------------------------------------------------------
+# Stream
+# ---------------------------------------------------------------------------
+
+
+class KsemGdrStream:
+    """Wertet den GDR-Stream des Hubs aus und verteilt geänderte Live-Werte."""
+
+    def __init__(self, hass, entry_id: str):
+        self._hass = hass
+        self.signal = gdr_signal(entry_id)
+        self.values: dict[str, dict] = {}  # uuid -> {sensor_key: wert}
+        self.connected = False
+
+    def attach(self, hub):
+        """Meldet den Stream am WebSocket-Hub an; liefert die Abmeldefunktion."""
+        return hub.subscribe(GDR_PATH, self.handle_message, self.set_connected)
+
+    @callback
+    def handle_message(self, path: str, data: bytes):
+        try:
+            gdrs = list(iter_gdrs(data))
+        except (ValueError, IndexError, struct.error) as err:
+            _LOGGER.warning("GDR-Frame nicht lesbar: %s", err)
+            return
+        for gdr in gdrs:
+            uuid = gdr["id"]
+            current = self.values.setdefault(uuid, {})
+            changed = {}
+            for obis, value in gdr["values"].items():
+                key = OBIS_INDEX.get(obis)
+                if key is not None and current.get(key) != value:
+                    current[key] = value
+                    changed[key] = value
+            if changed:
+                async_dispatcher_send(self._hass, self.signal, uuid, changed)
+
+    @callback
+    def set_connected(self, connected: bool):
+        self.connected = connected
+        # uuid None: nur Verfügbarkeit hat sich geändert
+        async_dispatcher_send(self._hass, self.signal, None, {})
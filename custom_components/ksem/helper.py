@@ -1,5 +1,11 @@
 from __future__ import annotations
 
+import logging
+import time
+
+# gleiche Warnung (je Schlüssel) höchstens einmal in diesem Zeitraum
+LOG_THROTTLE_S = 300.0
+
 
 def bearer_header(access_token: str) -> dict:
     """Erzeugt Header für Bearer-Token-Authentifizierung"""
@@ -17,3 +23,45 @@ def first_evse_from_coordinator(coord) -> dict | None:
         if wb.get("available"):
             return wb
     return evses[0]  # Fallback: erste, auch wenn offline
+
+
+def evse_state_available(state: str | None) -> bool:
+    """False, wenn der EVSE-State einen Kommunikationsfehler/Offline meldet."""
+    state = (state or "").lower()
+    return not ("commerror" in state or "error" in state or "offline" in state)
+
+
+class LogThrottle:
+    """Warnungen, die bei Ausfällen je Poll wiederkehren, gedrosselt ausgeben.
+
+    Je Schlüssel (z. B. Registerblock, Wallbox) erscheint höchstens eine
+    Warnung pro LOG_THROTTLE_S, auch wenn der Fehler zwischendurch kurz
+    verschwindet; Wiederholungen gehen auf DEBUG und werden mitgezählt.
+    """
+
+    def __init__(self, logger: logging.Logger, interval: float = LOG_THROTTLE_S):
+        self._logger = logger
+        self._interval = interval
+        # Schlüssel -> [Zeitpunkt der Warnung, unterdrückt, Warnung offen]
+        self._last: dict = {}
+
+    def warning(self, key, msg: str, *args) -> None:
+        now = time.monotonic()
+        seen = self._last.get(key)
+        if seen is not None and now - seen[0] < self._interval:
+            seen[1] += 1
+            self._logger.debug(msg, *args)
+            return
+        if seen is not None and seen[1]:
+            msg += " (%s gleiche Meldungen unterdrückt)"
+            args = (*args, seen[1])
+        self._last[key] = [now, 0, True]
+        self._logger.warning(msg, *args)
+
+    def clear(self, key) -> bool:
+        """Fehler behoben; True, wenn zuvor eine Warnung ausgegeben wurde."""
+        seen = self._last.get(key)
+        if seen is None or not seen[2]:
+            return False
+        seen[2] = False
+        return True
@@ -0,0 +1,164 @@
+"""Ringpuffer der schnellen Modbus-Werte mit Aggregation (min/max/mean)."""
+
+import math
+from array import array
+
+from .modbus_map import DEFAULT_POLL_TIER, POLL_TIERS, SENSOR_DEFINITIONS
+from .snapshot import SLOT_NAMES, SLOTS
+
+NAN = math.nan
+
+# Aufbewahrung der Rohwerte im Speicher und Fenster für den veröffentlichten Mittelwert
+HISTORY_SECONDS = 3600
+DOWNSAMPLE_WINDOW_S = 10
+
+# Leistungswerte (W) mit poll_tier "fast" landen im Ringpuffer; Zustände wie
+# Lademodus oder SoC werden weiter direkt veröffentlicht
+HISTORY_SLOTS = tuple(
+    SLOTS[spec["name"]]
+    for spec in SENSOR_DEFINITIONS.values()
+    if spec.get("poll_tier", DEFAULT_POLL_TIER) == "fast" and spec.get("unit") == "W"
+)
+
+
+class KsemHistory:
+    """Ringpuffer mit fester Größe: ein Zeitstempel und eine Zeile Werte je Sample.
+
+    Speicher: capacity * (len(slots) + 1) * 8 Byte, unabhängig von der Laufzeit.
+    """
+
+    def __init__(self, slots: tuple = HISTORY_SLOTS, capacity: int | None = None):
+        if capacity is None:
+            capacity = HISTORY_SECONDS // POLL_TIERS["fast"]
+        self.slots = slots
+        self.capacity = capacity
+        self._column = {slot: col for col, slot in enumerate(slots)}
+        self._width = len(slots)
+        self._times = array("d", [NAN]) * capacity
+        self._values = array("d", [NAN]) * (capacity * self._width)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def memory_bytes(self) -> int:
+        return (len(self._times) + len(self._values)) * self._values.itemsize
+
+    def append(self, timestamp: float, snapshot):
+        """Übernimmt die History-Slots eines ModbusSnapshot."""
+        raw = snapshot.raw
+        base = self._next * self._width
+        values = self._values
+        for col, slot in enumerate(self.slots):
+            values[base + col] = raw[slot]
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _rows(self, since: float, until: float = math.inf):
+        """Ring-Indizes der Samples im Zeitraum, älteste zuerst."""
+        times = self._times
+        capacity = self.capacity
+        # von hinten bis zum ersten Sample vor since: kurze Fenster ohne Vollscan
+        first = self._count
+        while (
+            first and times[(self._next - self._count + first - 1) % capacity] >= since
+        ):
+            first -= 1
+        start = self._next - self._count
+        for i in range(first, self._count):
+            row = (start + i) % capacity
+            if times[row] >= until:
+                break
+            yield row
+
+    def samples(self, slot: int, since: float, until: float = math.inf) -> list:
+        """Rohwerte (Zeitstempel, Wert) eines Slots; fehlende Werte ausgelassen."""
+        col = self._column[slot]
+        width = self._width
+        result = []
+        for row in self._rows(since, until):
+            value = self._values[row * width + col]
+            if value == value:
+                result.append((self._times[row], value))
+        return result
+
+    def aggregate(
+        self, slot: int, since: float, until: float = math.inf
+    ) -> dict | None:
+        """min/max/mean/count eines Slots im Zeitraum (None ohne gültige Werte)."""
+        count = 0
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        for _, value in self.samples(slot, since, until):
+            count += 1
+            total += value
+            low = min(low, value)
+            high = max(high, value)
+        if not count:
+            return None
+        return {"min": low, "max": high, "mean": total / count, "count": count}
+
+    def means(self, since: float) -> dict:
+        """Mittelwert je Slot seit since (NaN ohne gültige Werte) in einem Durchlauf."""
+        width = self._width
+        totals = [0.0] * width
+        counts = [0] * width
+        values = self._values
+        for row in self._rows(since):
+            base = row * width
+            for col in range(width):
+                value = values[base + col]
+                if value == value:
+                    totals[col] += value
+                    counts[col] += 1
+        return {
+            slot: totals[col] / counts[col] if counts[col] else NAN
+            for col, slot in enumerate(self.slots)
+        }
+
+    def buckets(self, slot: int, since: float, until: float, resolution: float) -> list:
+        """Aggregiert einen Slot in Fenster der Länge resolution (ein Durchlauf)."""
+        result = []
+        current = None
+        for timestamp, value in self.samples(slot, since, until):
+            index = int((timestamp - since) // resolution)
+            if current is None or current["index"] != index:
+                current = {
+                    "index": index,
+                    "start": since + index * resolution,
+                    "end": min(since + (index + 1) * resolution, until),
+                    "min": value,
+                    "max": value,
+                    "sum": 0.0,
+                    "count": 0,
+                }
+                result.append(current)
+            current["min"] = min(current["min"], value)
+            current["max"] = max(current["max"], value)
+            current["sum"] += value
+            current["count"] += 1
+        return [
+            {
+                "start": b["start"],
+                "end": b["end"],
+                "min": b["min"],
+                "max": b["max"],
+                "mean": b["sum"] / b["count"],
+                "count": b["count"],
+            }
+            for b in result
+        ]
+
+    def as_dict(self) -> dict:
+        oldest = self._times[(self._next - self._count) % self.capacity]
+        return {
+            "samples": self._count,
+            "capacity": self.capacity,
+            "sensors": [SLOT_NAMES[slot] for slot in self.slots],
+            "memory_bytes": self.memory_bytes,
+            "oldest": oldest if self._count else None,
+        }
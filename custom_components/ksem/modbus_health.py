@@ -0,0 +1,76 @@
+"""Verbindungszustand und Reconnect-Backoff für die Modbus-Verbindung."""
+
+import datetime
+import random
+import time
+
+# Exponentieller Backoff zwischen Verbindungsversuchen (mit Jitter)
+RECONNECT_BASE_S = 1.0
+RECONNECT_MAX_S = 60.0
+
+STATE_CONNECTED = "connected"
+STATE_DISCONNECTED = "disconnected"
+STATE_BACKOFF = "backoff"
+
+
+class ModbusConnectionHealth:
+    """Merkt sich Zustand, Fehler und Kennzahlen einer Modbus-Verbindung."""
+
+    def __init__(
+        self, base: float = RECONNECT_BASE_S, maximum: float = RECONNECT_MAX_S
+    ):
+        self.base = base
+        self.maximum = maximum
+        self.state = STATE_DISCONNECTED
+        self.failures = 0  # aufeinanderfolgende Fehlschläge
+        self.reconnects = 0
+        self.dropped = 0  # wegen toter/halboffener Verbindung getrennt
+        self.poll_timeouts = 0
+        self.last_error: str | None = None
+        self.connected_since: datetime.datetime | None = None
+        self.retry_at = 0.0  # monotonic; vorher kein neuer Verbindungsversuch
+        self._was_connected = False
+
+    def retry_in(self, now: float | None = None) -> float:
+        """Sekunden bis zum nächsten erlaubten Verbindungsversuch (0 = sofort)."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.retry_at - now)
+
+    def mark_connected(self):
+        if self._was_connected:
+            self.reconnects += 1
+        self._was_connected = True
+        self.state = STATE_CONNECTED
+        self.failures = 0
+        self.retry_at = 0.0
+        self.connected_since = datetime.datetime.now(datetime.timezone.utc)
+
+    def mark_failed(self, err) -> float:
+        """Verbucht einen Fehlschlag und liefert die Wartezeit bis zum nächsten Versuch."""
+        self.failures += 1
+        self.last_error = str(err) or type(err).__name__
+        delay = min(self.maximum, self.base * 2 ** (self.failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        self.retry_at = time.monotonic() + delay
+        self.state = STATE_BACKOFF
+        self.connected_since = None
+        return delay
+
+    def mark_dropped(self, err) -> float:
+        """Verbindung als tot erkannt (Timeout ohne jede Antwort, Poll-Budget überschritten)."""
+        self.dropped += 1
+        return self.mark_failed(err)
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "reconnects": self.reconnects,
+            "dropped_connections": self.dropped,
+            "poll_timeouts": self.poll_timeouts,
+            "last_error": self.last_error,
+            "connected_since": self.connected_since.isoformat()
+            if self.connected_since
+            else None,
+            "retry_in": round(self.retry_in(), 1),
+        }
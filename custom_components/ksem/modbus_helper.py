@@ -1,244 +1,556 @@
+import asyncio
 import logging
+import struct
+import time
+from typing import NamedTuple
 from pymodbus.client import AsyncModbusTcpClient
-from .modbus_map import SENSOR_DEFINITIONS
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+from .helper import LogThrottle
+from .modbus_health import STATE_DISCONNECTED, ModbusConnectionHealth
+from .modbus_map import DEFAULT_POLL_TIER, POLL_TIERS, SENSOR_DEFINITIONS
+from .modbus_pipeline import ModbusReadError, ModbusTcpPipeline
+from .snapshot import NAN, SLOTS, ModbusSnapshot, empty_values
+from .stats import ModbusStats
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def group_register_blocks(sensor_defs, max_gap=2):
-    sorted_addresses = sorted(sensor_defs.keys())
+# Registergröße und struct-Code je Datentyp (KSEM: Big Endian, High Word zuerst)
+REGISTER_TYPES = {
+    "uint16": (1, "H"),
+    "int16": (1, "h"),
+    "uint32": (2, "I"),
+    "int32": (2, "i"),
+    "float32": (2, "f"),
+    "uint64": (4, "Q"),
+    "int64": (4, "q"),
+}
+
+
+def register_size(dtype: str) -> int:
+    """Anzahl 16-Bit-Register für einen Datentyp."""
+    return REGISTER_TYPES.get(dtype, (4, "Q"))[0]
+
+
+# Modbus-Limit für Read Holding Registers pro Request
+MAX_READ_REGISTERS = 125
+# Kostenmodell für das Zusammenfassen: ein Roundtrip vs. Zeit pro zusätzlich gelesenem Register
+MODBUS_ROUNDTRIP_S = 0.02
+MODBUS_WORD_S = 0.0002
+# Toleranz, damit ein Tier nicht wegen Tick-Jitter einen ganzen Zyklus verpasst
+POLL_TIER_TOLERANCE_S = 0.5
+# Modbus-Exception-Code "Illegal Data Address"
+ILLEGAL_DATA_ADDRESS = 0x02
+
+# Gleichzeitig offene Requests auf einer Verbindung (1 = streng nacheinander)
+DEFAULT_MODBUS_WINDOW = 4
+# Parallele Verbindungen, falls das Gateway kein Pipelining verträgt
+DEFAULT_MODBUS_POOL_SIZE = 2
+# Fehlversuche mit mehreren offenen Requests, bevor auf den Pool gewechselt wird
+PIPELINE_MAX_FAILURES = 2
+MODBUS_TIMEOUT = 5
+# Obergrenze für einen kompletten Poll; danach gilt die Verbindung als tot
+MODBUS_POLL_BUDGET_S = 8
+
+
+def plan_register_blocks(
+    sensor_defs,
+    roundtrip_s=MODBUS_ROUNDTRIP_S,
+    word_s=MODBUS_WORD_S,
+    max_count=MAX_READ_REGISTERS,
+    unreadable=frozenset(),
+):
+    """Gruppiert Adressen nach Kostenmodell.
+
+    Eine Lücke wird mitgelesen, wenn das billiger ist als ein weiterer Roundtrip,
+    der Block das Request-Limit nicht überschreitet und keine der Lücken-Adressen
+    vom Gerät abgelehnt wurde (unreadable).
+    """
     blocks = []
     block = []
     last_end = None
 
-    for addr in sorted_addresses:
-        t = sensor_defs[addr]["type"]
-        if t in ("uint16", "int16"):
-            reg_size = 1
-        elif t in ("uint32", "int32"):
-            reg_size = 2
-        else:
-            reg_size = 4
-
-        if last_end is None or addr <= last_end + max_gap:
-            block.append((addr, reg_size))
-            last_end = addr + reg_size - 1
-        else:
-            blocks.append(block)
-            block = [(addr, reg_size)]
-            last_end = addr + reg_size - 1
+    for addr in sorted(sensor_defs.keys()):
+        reg_size = register_size(sensor_defs[addr]["type"])
+
+        if block:
+            gap = addr - last_end - 1
+            merge = (
+                gap * word_s < roundtrip_s
+                and addr + reg_size - block[0][0] <= max_count
+                and not any(a in unreadable for a in range(last_end + 1, addr))
+            )
+            if not merge:
+                blocks.append(block)
+                block = []
+        block.append((addr, reg_size))
+        last_end = addr + reg_size - 1
     if block:
         blocks.append(block)
 
-    _LOGGER.debug("Gruppierte Modbus-Registerblöcke: %s", blocks)
+    _LOGGER.debug("Geplante Modbus-Registerblöcke: %s", blocks)
     return blocks
 
 
+class ReadBlock(NamedTuple):
+    """Vorkompilierter Leseblock: ein Request, ein struct.unpack_from."""
+
+    start: int
+    count: int
+    registers: struct.Struct  # packt Register (pymodbus-Pfad) in buffer
+    buffer: bytearray  # vorbelegter Puffer des Blocks, je Poll überschrieben
+    values: struct.Struct  # entpackt alle Werte des Blocks in einem Schritt
+    names: tuple
+    slots: tuple  # Slot je Wert im ModbusSnapshot
+    scales: tuple
+    offsets: tuple  # Register-Offset jedes Werts relativ zu start
+    gaps: tuple  # mitgelesene, nicht definierte Adressbereiche (von, bis exkl.)
+    tiers: frozenset  # poll_tiers der enthaltenen Werte
+
+
+def compile_block(sensor_defs, block) -> ReadBlock:
+    """Übersetzt eine Liste (addr, size) in einen ReadBlock mit struct-Format."""
+    start = block[0][0]
+    fmt = [">"]
+    names = []
+    slots = []
+    scales = []
+    offsets = []
+    gaps = []
+    tiers = set()
+    pos = start
+    for addr, size in block:
+        spec = sensor_defs[addr]
+        if addr > pos:
+            fmt.append(f"{(addr - pos) * 2}x")  # Lücke überspringen
+            gaps.append((pos, addr))
+        fmt.append(REGISTER_TYPES[spec["type"]][1])
+        names.append(spec["name"])
+        slots.append(SLOTS[spec["name"]])
+        scale = spec.get("scale")
+        scales.append(1 if scale is None else scale)
+        offsets.append(addr - start)
+        tiers.add(spec.get("poll_tier", DEFAULT_POLL_TIER))
+        pos = addr + size
+    count = pos - start
+    return ReadBlock(
+        start=start,
+        count=count,
+        registers=struct.Struct(f">{count}H"),
+        buffer=bytearray(count * 2),
+        values=struct.Struct("".join(fmt)),
+        names=tuple(names),
+        slots=tuple(slots),
+        scales=tuple(scales),
+        offsets=tuple(offsets),
+        gaps=tuple(gaps),
+        tiers=frozenset(tiers),
+    )
+
+
+def compile_read_plan(sensor_defs, unreadable=frozenset()) -> tuple:
+    """Erzeugt den unveränderlichen Leseplan (Tupel von ReadBlocks).
+
+    Blöcke dürfen Tiers mischen: ein Block wird gelesen, sobald eines seiner
+    Tiers fällig ist, und liefert dann alle enthaltenen Werte.
+    """
+    return tuple(
+        compile_block(sensor_defs, block)
+        for block in plan_register_blocks(sensor_defs, unreadable=unreadable)
+    )
+
+
+def decode_block(block: ReadBlock, payload, values):
+    """Entpackt einen Block in einem Schritt und schreibt skalierte Werte in values.
+
+    Vorzeichen und Wortreihenfolge stecken im struct-Format, die Einheit im
+    vorab je Block abgelegten Skalenfaktor; je Wert bleibt eine Multiplikation.
+    """
+    raw = block.values.unpack_from(payload)
+    for slot, val, scale in zip(block.slots, raw, block.scales):
+        values[slot] = val * scale
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(
+            "Block %s (%s Regs): %s",
+            block.start,
+            block.count,
+            dict(zip(block.names, raw)),
+        )
+
+
 class KsemModbusClient:
-    def __init__(self, host: str, port: int = 502, unit_id: int = 1):
+    def __init__(
+        self,
+        host: str,
+        port: int = 502,
+        unit_id: int = 1,
+        window: int = DEFAULT_MODBUS_WINDOW,
+        pool_size: int = DEFAULT_MODBUS_POOL_SIZE,
+    ):
         self.host = host
         self.port = port
         self.unit_id = unit_id
-        self._client = None
+        self.window = max(1, window)
+        self.pool_size = max(1, pool_size)
+        self._pipeline: ModbusTcpPipeline | None = None
+        self._pipeline_failures = 0
+        self._failed_pipeline: ModbusTcpPipeline | None = None  # schon gezählt
+        self._clients: list = []
+        self._pool: asyncio.Queue | None = None
+        self._unreadable: set[int] = set()
+        self._plan = compile_read_plan(SENSOR_DEFINITIONS)
+        self._next_due = dict.fromkeys(
+            {tier for block in self._plan for tier in block.tiers}, 0.0
+        )
+        self._values = empty_values()  # Arbeitspuffer, je Poll als Snapshot kopiert
+        self.health = ModbusConnectionHealth()
+        self.stats = ModbusStats()
+        self._log = LogThrottle(_LOGGER)  # wiederkehrende Warnungen je Block/Verbindung
+        self._answered = 0
+        self._unanswered = 0
+
+    @property
+    def poll_interval(self) -> float:
+        """Tick-Intervall für den Coordinator: das schnellste poll_tier."""
+        return min(POLL_TIERS[tier] for tier in self._next_due)
+
+    @property
+    def pipelined(self) -> bool:
+        """True, solange Blöcke per Pipelining über eine Verbindung gelesen werden."""
+        return self.window > 1 and self._pipeline_failures < PIPELINE_MAX_FAILURES
+
+    async def _create_client(self):
+        # Client erzeugen (versionssicher)
+        try:
+            # Neuere pymodbus-Versionen akzeptieren unit_id direkt
+            client = AsyncModbusTcpClient(
+                self.host, port=self.port, timeout=MODBUS_TIMEOUT, unit_id=self.unit_id
+            )
+        except TypeError:
+            # Ältere/andere Builds: ohne unit_id instanzieren und danach setzen
+            client = AsyncModbusTcpClient(
+                self.host, port=self.port, timeout=MODBUS_TIMEOUT
+            )
+            try:
+                setattr(client, "unit_id", self.unit_id)
+            except Exception:
+                pass
+        await client.connect()
+        return client
+
+    def _is_open(self) -> bool:
+        if self.pipelined:
+            return bool(self._pipeline and self._pipeline.connected)
+        return bool(self._clients) and all(
+            getattr(client, "connected", True) for client in self._clients
+        )
+
+    async def _open(self):
+        await self._close_transports()
+        if self.pipelined:
+            self._pipeline = ModbusTcpPipeline(
+                self.host,
+                port=self.port,
+                unit_id=self.unit_id,
+                window=self.window,
+                timeout=MODBUS_TIMEOUT,
+            )
+            await self._pipeline.connect()
+            return
+
+        # ohne Pipelining: eine Verbindung, nach Fallback ein kleiner Pool
+        size = 1 if self.window == 1 else self.pool_size
+        for _ in range(size):
+            client = await self._create_client()
+            self._clients.append(client)
+            if not getattr(client, "connected", True):
+                raise ConnectionError("Verbindungsaufbau fehlgeschlagen")
+        self._pool = asyncio.Queue()
+        for client in self._clients:
+            self._pool.put_nowait(client)
+        _LOGGER.debug(
+            "Modbus TCP verbunden mit %s:%s (Unit %s, %s Verbindung(en))",
+            self.host,
+            self.port,
+            self.unit_id,
+            size,
+        )
 
     async def connect(self):
-        if not self._client:
-            # old: self._client = AsyncModbusTcpClient(self.host, port=self.port)
-            # Client erzeugen (versionssicher)
-            try:
-                # Neuere pymodbus-Versionen akzeptieren unit_id direkt
-                self._client = AsyncModbusTcpClient(
-                    self.host, port=self.port, timeout=5, unit_id=self.unit_id
-                )
-            except TypeError:
-                # Ältere/andere Builds: ohne unit_id instanzieren und danach setzen
-                self._client = AsyncModbusTcpClient(
-                    self.host, port=self.port, timeout=5
-                )
-                try:
-                    setattr(self._client, "unit_id", self.unit_id)
-                except Exception:
-                    pass
-            await self._client.connect()
-            _LOGGER.debug(
-                "Modbus TCP verbunden mit %s:%s (Unit %s)",
+        """Stellt die Verbindung her; während des Backoffs sofortiger Fehler statt Wartezeit."""
+        if self._is_open():
+            return
+        retry_in = self.health.retry_in()
+        if retry_in > 0:
+            raise ConnectionError(
+                f"Modbus {self.host}: neuer Verbindungsversuch in {retry_in:.1f} s"
+            )
+        try:
+            await self._open()
+        except Exception as err:
+            await self._close_transports()
+            delay = self.health.mark_failed(err)
+            self._log.warning(
+                "connection",
+                "Modbus-Verbindung zu %s fehlgeschlagen: %s (nächster Versuch in %.1f s)",
                 self.host,
-                self.port,
-                self.unit_id,
+                err,
+                delay,
             )
+            raise ConnectionError(f"Modbus {self.host}: {err}") from err
+        self.health.mark_connected()
+        if self._log.clear("connection"):
+            _LOGGER.info("Modbus-Verbindung zu %s wiederhergestellt", self.host)
+
+    async def _close_transports(self):
+        if self._pipeline:
+            await self._pipeline.close()
+            self._pipeline = None
+        for client in self._clients:
+            result = client.close()  # je nach pymodbus-Version sync oder async
+            if asyncio.iscoroutine(result):
+                await result
+        self._clients = []
+        self._pool = None
+
+    async def _drop(self, reason: str):
+        """Trennt eine tote/halboffene Verbindung und plant den Reconnect."""
+        await self._close_transports()
+        delay = self.health.mark_dropped(reason)
+        self._log.warning(
+            "connection",
+            "Modbus-Verbindung zu %s verworfen: %s (neuer Versuch in %.1f s)",
+            self.host,
+            reason,
+            delay,
+        )
 
     async def disconnect(self):
-        if self._client:
-            await self._client.close()
-            self._client = None
-            self._protocol = None
-            _LOGGER.debug("Modbus TCP Verbindung getrennt")
-
-    async def read_all(self):
-        if not self._client:
-            await self.connect()
-
-        def _decode_fallback(raw_regs, dtype: str, word_order: str = "big"):
-            """Einfacher Decoder für häufige Typen, falls convert_from_registers nicht vorhanden ist."""
-            # Modbus-Word-Order: "big" = high word zuerst (KSEM nutzt Big Endian laut Doku)
-            words = list(raw_regs)
-            if word_order.lower() != "big":
-                words = list(reversed(words))
-
-            def _u16(w0):
-                return w0 & 0xFFFF
-
-            def _s16(w0):
-                v = w0 & 0xFFFF
-                return v - 0x10000 if v & 0x8000 else v
-
-            def _u32(w0, w1):
-                return ((w0 & 0xFFFF) << 16) | (w1 & 0xFFFF)
-
-            def _s32(w0, w1):
-                u = _u32(w0, w1)
-                return u - 0x1_0000_0000 if u & 0x8000_0000 else u
-
-            def _u64(w0, w1, w2, w3):
-                return (
-                    ((w0 & 0xFFFF) << 48)
-                    | ((w1 & 0xFFFF) << 32)
-                    | ((w2 & 0xFFFF) << 16)
-                    | (w3 & 0xFFFF)
-                )
-
-            dtype = dtype.upper()
-            n = len(words)
-
-            if dtype in ("UINT16", "U16") and n >= 1:
-                return _u16(words[0])
-            if dtype in ("INT16", "S16") and n >= 1:
-                return _s16(words[0])
-
-            if dtype in ("UINT32", "U32") and n >= 2:
-                return _u32(words[0], words[1])
-            if dtype in ("INT32", "S32") and n >= 2:
-                return _s32(words[0], words[1])
-
-            if dtype in ("UINT64", "U64") and n >= 4:
-                return _u64(words[0], words[1], words[2], words[3])
-
-            # Float/andere Typen kannst du bei Bedarf ergänzen.
-            raise ValueError(
-                f"Fallback-Decoder: Unsupported dtype '{dtype}' with {n} regs"
+        await self._close_transports()
+        self.health.state = STATE_DISCONNECTED
+        _LOGGER.debug("Modbus TCP Verbindung getrennt")
+
+    async def _read_registers(self, client, start: int, count: int):
+        # ---------- PyModbus 2/3/4-kompatibler Read ----------
+        try:
+            return await client.read_holding_registers(
+                address=start, count=count, unit=self.unit_id
             )
-
-        data = {}
-        blocks = group_register_blocks(SENSOR_DEFINITIONS, max_gap=0)
-
-        for block in blocks:
-            start = block[0][0]
-            total_words = sum(size for _, size in block)
-
-            try:
-                # ---------- PyModbus 2/3/4-kompatibler Read ----------
-                try:
-                    result = await self._client.read_holding_registers(
-                        address=start, count=total_words, unit=self.unit_id
-                    )
-                except TypeError:
-                    try:
-                        result = await self._client.read_holding_registers(
-                            address=start, count=total_words, slave=self.unit_id
-                        )
-                    except TypeError:
-                        try:
-                            result = await self._client.read_holding_registers(
-                                address=start, count=total_words
-                            )  # nutzt evtl. client.unit_id
-                        except TypeError:
-                            try:
-                                result = await self._client.read_holding_registers(
-                                    start, total_words
-                                )  # positionsbasiert
-                            except TypeError:
-                                result = await self._client.read_holding_registers(
-                                    start
-                                )  # letzter Fallback
-
-                # ---------- Ergebnis prüfen ----------
-                if result is None or getattr(result, "isError", lambda: False)():
+        except TypeError:
+            pass
+        try:
+            return await client.read_holding_registers(
+                address=start, count=count, slave=self.unit_id
+            )
+        except TypeError:
+            pass
+        try:
+            return await client.read_holding_registers(
+                address=start, count=count
+            )  # nutzt evtl. client.unit_id
+        except TypeError:
+            pass
+        try:
+            return await client.read_holding_registers(start, count)  # positionsbasiert
+        except TypeError:
+            return await client.read_holding_registers(start)  # letzter Fallback
+
+    async def _fetch_pooled(self, block: ReadBlock) -> bytearray:
+        client = await self._pool.get()
+        try:
+            result = await self._read_registers(client, block.start, block.count)
+        finally:
+            self._pool.put_nowait(client)
+
+        if result is None or getattr(result, "isError", lambda: False)():
+            raise ModbusReadError(
+                str(result), exception_code=getattr(result, "exception_code", None)
+            )
+        registers = getattr(result, "registers", None)
+        if not registers or len(registers) < block.count:
+            raise ModbusReadError(
+                f"Zu wenig Register erhalten ({0 if not registers else len(registers)}"
+                f"/{block.count}) für Block {block.start}-{block.start + block.count}"
+            )
+        if len(registers) > block.count:
+            registers = registers[: block.count]
+        # in den vorbelegten Puffer packen statt je Poll neue bytes anzulegen
+        block.registers.pack_into(block.buffer, 0, *registers)
+        return block.buffer
+
+    async def _fetch_pipelined(self, block: ReadBlock) -> memoryview:
+        pipeline = self._pipeline
+        try:
+            return await pipeline.read_holding_registers(block.start, block.count)
+        except (asyncio.TimeoutError, ConnectionError):
+            # Gateway verträgt evtl. kein Pipelining: trennt die Verbindung bei
+            # mehreren offenen Requests oder beantwortet nur den ersten
+            overlapped = pipeline.dropped_in_flight > 1 or (
+                pipeline.in_flight > 0 and pipeline.responses
+            )
+            if overlapped and self.pipelined and pipeline is not self._failed_pipeline:
+                self._failed_pipeline = pipeline  # einmal je Verbindung zählen
+                self._pipeline_failures += 1
+                if not self.pipelined:
                     _LOGGER.warning(
-                        "Modbus-Fehler beim Lesen von %s-%s: %s",
-                        start,
-                        start + total_words,
-                        result,
+                        "Modbus-Pipelining zu %s scheitert wiederholt, "
+                        "wechsle auf %s parallele Verbindungen",
+                        self.host,
+                        self.pool_size,
                     )
+            raise
+
+    def _exclude_gaps(self, block: ReadBlock) -> list:
+        """Merkt abgelehnte Lücken, baut den Plan neu und liefert Ersatzblöcke."""
+        for gap_start, gap_end in block.gaps:
+            self._unreadable.update(range(gap_start, gap_end))
+        self._plan = compile_read_plan(
+            SENSOR_DEFINITIONS, unreadable=frozenset(self._unreadable)
+        )
+        _LOGGER.info(
+            "Gerät lehnt Lücken %s in Block %s-%s ab, Leseplan ohne diese neu erstellt",
+            block.gaps,
+            block.start,
+            block.start + block.count,
+        )
+        end = block.start + block.count
+        # neu geplante Blöcke teilen den alten nur auf
+        return [b for b in self._plan if block.start <= b.start < end]
+
+    async def _read_block(self, block: ReadBlock):
+        """Liest einen Block; liefert Rohdaten, Ersatzblöcke (Liste) oder None."""
+        start = block.start
+        total_words = block.count
+        timing = self.stats.blocks[f"{start}-{start + total_words}"]
+        began = time.perf_counter()
+        try:
+            if self.pipelined and self._pipeline:
+                payload = await self._fetch_pipelined(block)
+            else:
+                payload = await self._fetch_pooled(block)
+            self._answered += 1
+            timing.record(time.perf_counter() - began, len(payload))
+            if self._log.clear(start):
+                _LOGGER.info(
+                    "Modbus-Block %s-%s wieder lesbar", start, start + total_words
+                )
+            return payload
+        except ModbusReadError as err:
+            self._answered += 1  # Gerät hat geantwortet, nur mit Fehler
+            timing.failed()
+            if block.gaps and err.exception_code == ILLEGAL_DATA_ADDRESS:
+                return self._exclude_gaps(block)
+            self._log.warning(
+                start,
+                "Modbus-Fehler beim Lesen von %s-%s: %s",
+                start,
+                start + total_words,
+                err,
+            )
+        except (
+            asyncio.TimeoutError,
+            ConnectionError,
+            ConnectionException,
+            ModbusIOException,
+        ) as err:
+            self._unanswered += 1
+            timing.failed()
+            self._log.warning(
+                start,
+                "Keine Antwort beim Lesen von %s-%s: %s",
+                start,
+                start + total_words,
+                str(err) or "Timeout",
+            )
+        except Exception as e:
+            timing.failed()
+            _LOGGER.exception(
+                "Fehler beim Modbus-Blocklesen (Start=0x%04X, Words=%s): %s",
+                start,
+                total_words,
+                e,
+            )
+        return None
+
+    async def _read_blocks(self, blocks: list, values):
+        """Liest die Blöcke und schreibt die skalierten Werte in ihre Slots."""
+        await self.connect()
+
+        pending = blocks
+        while pending:
+            pipelined = self.pipelined
+            # alle offenen Blöcke gleichzeitig anstoßen; das Fenster begrenzt die Requests
+            results = await asyncio.gather(*(self._read_block(b) for b in pending))
+            fell_back = pipelined and not self.pipelined
+            if fell_back:
+                await self.connect()
+            retry = []
+            for block, payload in zip(pending, results):
+                if payload is None:
+                    if fell_back:
+                        retry.append(block)  # über den Pool erneut lesen
+                    else:
+                        for slot in block.slots:
+                            values[slot] = NAN  # keine veralteten Werte melden
                     continue
-
-                registers = getattr(result, "registers", None)
-                if not registers or len(registers) < total_words:
-                    _LOGGER.warning(
-                        "Zu wenig Register erhalten (%s/%s) für Block %s-%s",
-                        0 if not registers else len(registers),
-                        total_words,
-                        start,
-                        start + total_words,
-                    )
+                if isinstance(payload, list):
+                    retry.extend(payload)
                     continue
 
-                # ---------- Entpacken / Konvertieren ----------
-                offset = 0
-                for addr, size in block:
-                    spec = SENSOR_DEFINITIONS[addr]
-                    raw_regs = registers[offset : offset + size]
-
-                    try:
-                        # Versuch 1: dein bisheriger Weg über DATATYPE/convert_from_registers
-                        datatype_name = spec["type"].upper()
-                        datatype_enum = getattr(
-                            getattr(self._client, "DATATYPE", None), datatype_name, None
-                        )
-                        if datatype_enum is not None and hasattr(
-                            self._client, "convert_from_registers"
-                        ):
-                            val = self._client.convert_from_registers(
-                                raw_regs,
-                                data_type=datatype_enum,
-                                # byteorder="big",  # bei Bedarf aktivieren
-                                word_order="big",
-                            )
-                        else:
-                            # Versuch 2: Fallback-Decoder (unterstützt die gängigen Integer-Typen)
-                            val = _decode_fallback(
-                                raw_regs, datatype_name, word_order="big"
-                            )
-
-                    except Exception as err:
-                        _LOGGER.warning(
-                            "Fehler beim Konvertieren von %s (Addr %s / %s Regs): %s",
-                            spec.get("name", addr),
-                            addr,
-                            size,
-                            err,
-                        )
-                        offset += size
-                        continue
-
-                    scaled_val = val * spec.get("scale", 1)
-                    _LOGGER.debug(
-                        "%s (%s): %s → skaliert: %s %s",
-                        spec.get("name", addr),
-                        addr,
-                        val,
-                        scaled_val,
-                        spec.get("unit", ""),
-                    )
-                    data[spec["name"]] = scaled_val
-                    offset += size
-
-            except Exception as e:
-                _LOGGER.exception(
-                    "Fehler beim Modbus-Blocklesen (Start=0x%04X, Words=%s): %s",
-                    start,
-                    total_words,
-                    e,
-                )
+                decode_block(block, payload, values)
+            pending = retry
+
+        if self._unanswered and not self._answered:
+            # kein einziger Block beantwortet: Verbindung ist tot oder halboffen
+            await self._drop("keine Antwort auf Modbus-Requests")
+            raise ConnectionError(f"Modbus {self.host}: keine Antwort")
+
+    async def _poll(self, blocks: list):
+        """Ein Poll mit Zeitbudget; Überschreitung trennt die Verbindung."""
+        self._answered = 0
+        self._unanswered = 0
+        began = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                self._read_blocks(blocks, self._values), timeout=MODBUS_POLL_BUDGET_S
+            )
+        except asyncio.TimeoutError as err:
+            self.stats.poll.failed()
+            self.health.poll_timeouts += 1
+            await self._drop(f"Poll-Budget von {MODBUS_POLL_BUDGET_S} s überschritten")
+            raise ConnectionError(f"Modbus {self.host}: Poll-Timeout") from err
+        except Exception:
+            self.stats.poll.failed()
+            raise
+        self.stats.poll.record(time.perf_counter() - began)
 
-        _LOGGER.debug("Alle OBIS-Daten gelesen: %s", data)
-        return data
+    async def read_all(self):
+        """Liest das komplette Mapping unabhängig von den poll_tiers."""
+        now = time.monotonic()
+        await self._poll(list(self._plan))
+        for tier in self._next_due:
+            self._next_due[tier] = now + POLL_TIERS[tier]
+        snapshot = ModbusSnapshot(self._values[:])
+        _LOGGER.debug("Alle OBIS-Daten gelesen: %s", snapshot)
+        return snapshot
+
+    async def read_due(self):
+        """Liest die fälligen poll_tiers; übrige Werte bleiben vom letzten Lauf.
+
+        Gelesen wird jeder Block mit einem fälligen Tier, samt der Werte nicht
+        fälliger Tiers darin.
+        """
+        now = time.monotonic()
+        due = [
+            tier
+            for tier, next_due in self._next_due.items()
+            if now + POLL_TIER_TOLERANCE_S >= next_due
+        ]
+        await self._poll(
+            [block for block in self._plan if not block.tiers.isdisjoint(due)]
+        )
+        for tier in due:
+            self._next_due[tier] = now + POLL_TIERS[tier]
+        snapshot = ModbusSnapshot(self._values[:])
+        _LOGGER.debug("OBIS-Daten gelesen (Tiers %s): %s", due, snapshot)
+        return snapshot
@@ -1,3 +1,14 @@
+# Abfrageintervall je poll_tier in Sekunden (Definitionen ohne poll_tier: "normal")
+POLL_TIERS = {
+    "fast": 1,
+    "normal": 10,
+    "slow": 60,
+}
+DEFAULT_POLL_TIER = "normal"
+# Optional je Definition "deadband": Änderungen unterhalb dieses Betrags (nach
+# Skalierung) lösen kein State-Update aus – für verrauschte Werte wie Frequenz
+# und Leistungsfaktor
+
 SENSOR_DEFINITIONS = {
     0: {
         "name": "Active Power+",
@@ -8,6 +19,7 @@ SENSOR_DEFINITIONS = {
         "device_class": "power",
         "state_class": "measurement",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     2: {
         "name": "Active Power-",
@@ -18,6 +30,7 @@ SENSOR_DEFINITIONS = {
         "device_class": "power",
         "state_class": "measurement",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     4: {
         "name": "Reactive Power+",
@@ -57,6 +70,7 @@ SENSOR_DEFINITIONS = {
         "unit": "unitless",
         "scale": 0.001,
         "type": "int32",
+        "deadband": 0.01,
         "device": "smartmeter",
     },
     26: {
@@ -65,6 +79,7 @@ SENSOR_DEFINITIONS = {
         "unit": "Hz",
         "scale": 0.001,
         "type": "uint32",
+        "deadband": 0.01,
         "device": "smartmeter",
     },
     40: {
@@ -74,6 +89,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     42: {
         "name": "Active Power- (L1)",
@@ -82,6 +98,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     44: {
         "name": "Reactive Power+ (L1)",
@@ -141,6 +158,7 @@ SENSOR_DEFINITIONS = {
         "unit": "unitless",
         "scale": 0.001,
         "type": "int32",
+        "deadband": 0.01,
         "device": "smartmeter",
     },
     80: {
@@ -150,6 +168,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     82: {
         "name": "Active Power- (L2)",
@@ -158,6 +177,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     84: {
         "name": "Reactive Power+ (L2)",
@@ -217,6 +237,7 @@ SENSOR_DEFINITIONS = {
         "unit": "unitless",
         "scale": 0.001,
         "type": "int32",
+        "deadband": 0.01,
         "device": "smartmeter",
     },
     120: {
@@ -226,6 +247,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     122: {
         "name": "Active Power- (L3)",
@@ -234,6 +256,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint32",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     124: {
         "name": "Reactive Power+ (L3)",
@@ -293,6 +316,7 @@ SENSOR_DEFINITIONS = {
         "unit": "unitless",
         "scale": 0.001,
         "type": "int32",
+        "deadband": 0.01,
         "device": "smartmeter",
     },
     146: {
@@ -312,6 +336,7 @@ SENSOR_DEFINITIONS = {
         "device_class": "energy",
         "state_class": "total_increasing",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     516: {
         "name": "Active energy-",
@@ -322,6 +347,7 @@ SENSOR_DEFINITIONS = {
         "device_class": "energy",
         "state_class": "total_increasing",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     520: {
         "name": "Reactive energy+",
@@ -330,6 +356,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     524: {
         "name": "Reactive energy-",
@@ -338,6 +365,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     544: {
         "name": "Apparent energy+",
@@ -346,6 +374,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     548: {
         "name": "Apparent energy-",
@@ -354,6 +383,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     592: {
         "name": "Active energy+ (L1)",
@@ -362,6 +392,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     596: {
         "name": "Active energy- (L1)",
@@ -370,6 +401,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     600: {
         "name": "Reactive energy+ (L1)",
@@ -378,6 +410,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     604: {
         "name": "Reactive energy- (L1)",
@@ -386,6 +419,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     624: {
         "name": "Apparent energy+ (L1)",
@@ -394,6 +428,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     628: {
         "name": "Apparent energy- (L1)",
@@ -402,6 +437,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     672: {
         "name": "Active energy+ (L2)",
@@ -410,6 +446,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     676: {
         "name": "Active energy- (L2)",
@@ -418,6 +455,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     680: {
         "name": "Reactive energy+ (L2)",
@@ -426,6 +464,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     684: {
         "name": "Reactive energy- (L2)",
@@ -434,6 +473,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     704: {
         "name": "Apparent energy+ (L2)",
@@ -442,6 +482,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     708: {
         "name": "Apparent energy- (L2)",
@@ -450,6 +491,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     752: {
         "name": "Active energy+ (L3)",
@@ -458,6 +500,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     756: {
         "name": "Active energy- (L3)",
@@ -466,6 +509,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     760: {
         "name": "Reactive energy+ (L3)",
@@ -474,6 +518,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     764: {
         "name": "Reactive energy- (L3)",
@@ -482,6 +527,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     784: {
         "name": "Apparent energy+ (L3)",
@@ -490,6 +536,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     788: {
         "name": "Apparent energy- (L3)",
@@ -498,6 +545,7 @@ SENSOR_DEFINITIONS = {
         "scale": 0.1,
         "type": "uint64",
         "device": "smartmeter",
+        "poll_tier": "slow",
     },
     49206: {
         "name": "Enector_status",
@@ -544,6 +592,7 @@ SENSOR_DEFINITIONS = {
         "device_class": "energy",
         "state_class": "total_increasing",
         "device": "wallbox",
+        "poll_tier": "slow",
     },
     40972: {
         "name": "Grid power Total",
@@ -551,6 +600,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40974: {
         "name": "Sum output inverter AC",
@@ -558,6 +608,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40976: {
         "name": "Sum pv power inverter DC",
@@ -565,6 +616,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40982: {
         "name": "Home consumption",
@@ -572,6 +624,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40984: {
         "name": "Sum battery charge/discharge DC",
@@ -579,6 +632,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40986: {
         "name": "System state of charge",
@@ -586,6 +640,7 @@ SENSOR_DEFINITIONS = {
         "unit": "%",
         "device_class": "battery",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40988: {
         "name": "Home consumption from PV",
@@ -593,6 +648,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40990: {
         "name": "Home consumption from battery",
@@ -600,6 +656,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40992: {
         "name": "Home consumption from grid",
@@ -607,12 +664,14 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40994: {
         "name": "Active charge mode",
         "type": "uint16",
         "unit": "",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40996: {
         "name": "Sum wallbox charge power total",
@@ -620,6 +679,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     40998: {
         "name": "Sum wallbox charge power PV",
@@ -627,6 +687,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     41000: {
         "name": "Sum wallbox charge power battery",
@@ -634,6 +695,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     41002: {
         "name": "Sum wallbox charge power grid",
@@ -641,6 +703,7 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     41010: {
         "name": "Sum inverter control values",
@@ -648,11 +711,13 @@ SENSOR_DEFINITIONS = {
         "unit": "W",
         "device_class": "power",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
     41012: {
         "name": "Curtailment active",
         "type": "uint16",
         "unit": "",
         "device": "smartmeter",
+        "poll_tier": "fast",
     },
 }
@@ -0,0 +1,154 @@
+"""Schlanker Modbus-TCP-Client mit Pipelining (mehrere Requests gleichzeitig)."""
+
+import asyncio
+import logging
+import struct
+
+_LOGGER = logging.getLogger(__name__)
+
+# MBAP-Header: Transaction-ID, Protocol-ID, Länge, Unit-ID
+MBAP_HEADER = struct.Struct(">HHHB")
+# Read Holding Registers (0x03) inkl. MBAP-Header
+READ_HOLDING_REQUEST = struct.Struct(">HHHBBHH")
+FC_READ_HOLDING_REGISTERS = 0x03
+
+
+class ModbusReadError(Exception):
+    """Fehlerantwort oder unvollständige Antwort beim Lesen eines Blocks."""
+
+    def __init__(self, message: str, exception_code: int | None = None):
+        super().__init__(message)
+        self.exception_code = exception_code
+
+
+class ModbusTcpPipeline:
+    """Hält eine TCP-Verbindung und ordnet Antworten per Transaction-ID zu.
+
+    Bis zu `window` Requests sind gleichzeitig unterwegs; die Antworten dürfen
+    in beliebiger Reihenfolge eintreffen.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 502,
+        unit_id: int = 1,
+        window: int = 4,
+        timeout: float = 5,
+    ):
+        self.host = host
+        self.port = port
+        self.unit_id = unit_id
+        self.timeout = timeout
+        self._window = asyncio.Semaphore(window)
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._receiver: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._tid = 0
+        self.responses = 0  # empfangene Antworten auf dieser Verbindung
+        # offene Requests, als die Verbindung abbrach (0 = nicht abgebrochen)
+        self.dropped_in_flight = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=self.timeout
+        )
+        self._receiver = asyncio.get_running_loop().create_task(self._receive())
+        _LOGGER.debug(
+            "Modbus TCP (Pipeline) verbunden mit %s:%s (Unit %s)",
+            self.host,
+            self.port,
+            self.unit_id,
+        )
+
+    async def close(self):
+        if self._receiver and not self._receiver.done():
+            self._receiver.cancel()
+            try:
+                await self._receiver
+            except asyncio.CancelledError:
+                pass
+        self._receiver = None
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+        self._fail_pending(ConnectionError("Modbus-Verbindung geschlossen"))
+
+    def _next_tid(self) -> int:
+        while True:
+            self._tid = (self._tid + 1) & 0xFFFF
+            if self._tid not in self._pending:
+                return self._tid
+
+    def _fail_pending(self, err: Exception):
+        # vor dem Leeren merken: die Wartenden sehen danach in_flight == 0
+        self.dropped_in_flight = max(self.dropped_in_flight, len(self._pending))
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(err)
+        self._pending.clear()
+
+    async def read_holding_registers(self, address: int, count: int) -> memoryview:
+        """Liest `count` Register ab `address` und liefert die Rohdaten (Big Endian).
+
+        Die Daten sind eine memoryview auf die empfangene PDU (ohne Kopie).
+        """
+        async with self._window:
+            if not self.connected:
+                raise ConnectionError("Modbus-Verbindung nicht aufgebaut")
+            tid = self._next_tid()
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[tid] = fut
+            self._writer.write(
+                READ_HOLDING_REQUEST.pack(
+                    tid, 0, 6, self.unit_id, FC_READ_HOLDING_REGISTERS, address, count
+                )
+            )
+            try:
+                pdu = await asyncio.wait_for(fut, timeout=self.timeout)
+            finally:
+                self._pending.pop(tid, None)
+
+        if pdu[0] & 0x80:
+            raise ModbusReadError(
+                f"Exception-Code {pdu[1]} für {address}-{address + count}",
+                exception_code=pdu[1],
+            )
+        size = count * 2
+        if len(pdu) < 2 + size or pdu[1] < size:
+            raise ModbusReadError(
+                f"Zu wenig Register erhalten ({pdu[1] // 2}/{count}) "
+                f"für Block {address}-{address + count}"
+            )
+        return memoryview(pdu)[2 : 2 + size]
+
+    async def _receive(self):
+        try:
+            while True:
+                header = await self._reader.readexactly(MBAP_HEADER.size)
+                tid, _, length, _ = MBAP_HEADER.unpack(header)
+                pdu = await self._reader.readexactly(length - 1)
+                fut = self._pending.get(tid)
+                if fut is None or fut.done():
+                    _LOGGER.debug("Antwort mit unbekannter Transaction-ID %s", tid)
+                    continue
+                self.responses += 1
+                fut.set_result(pdu)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as err:
+            _LOGGER.debug("Modbus-Pipeline getrennt: %s", err)
+            if self._writer:
+                self._writer.close()
+            self._fail_pending(ConnectionError(f"Modbus-Verbindung getrennt: {err}"))
@@ -9,7 +9,6 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     data = hass.data[DOMAIN][entry.entry_id]
-    client = data["client"]
     wallbox_coord = data.get("wallbox_coordinator")
     device_info_from_sensor = data.get("wallbox_device_info")
     last_ws_data = data.get("last_chargemode", {}) or {}
@@ -47,14 +46,12 @@ async def async_setup_entry(hass, entry, async_add_entities):
         wb_device_info = device_info_from_sensor or _build_wb_device_info(wb)
 
         entity1 = MinPvPowerQuota(
-            client=client,
             device_info=wb_device_info,
             initial=last_ws_data.get("minpvpowerquota", 0),
             entry_id=entry.entry_id,
             wallbox_coord=wallbox_coord,
         )
         entity2 = MinChargingPowerQuota(
-            client=client,
             device_info=wb_device_info,
             initial=last_ws_data.get("mincharginpowerquota", 0),
             entry_id=entry.entry_id,
@@ -62,10 +59,6 @@ async def async_setup_entry(hass, entry, async_add_entities):
         )
 
         async_add_entities([entity1, entity2])
-        hass.data[DOMAIN][entry.entry_id]["quota_entities"] = {
-            "minpv": entity1,
-            "mincharge": entity2,
-        }
         entities_created = True  # <- markiert als fertig
 
     # 1) Sofort versuchen
@@ -80,6 +73,30 @@ async def async_setup_entry(hass, entry, async_add_entities):
         wallbox_coord.async_add_listener(_wb_listener)
 
 
+class _ChargeModeQuotaMixin:
+    """Quote über die Schreib-Warteschlange: optimistisch, bestätigt durch den PUT."""
+
+    _quota_key: str
+
+    def _init_quota(self, entry_id, initial):
+        self._entry_id = entry_id
+        self._initial = int(initial or 0)
+
+    @property
+    def _queue(self):
+        return self.hass.data[DOMAIN][self._entry_id]["chargemode_queue"]
+
+    @property
+    def native_value(self):
+        return int(self._queue.state.get(self._quota_key, self._initial))
+
+    async def async_set_native_value(self, value: float):
+        await self._queue.async_set(**{self._quota_key: int(value)})
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._queue.add_listener(self.async_write_ha_state))
+
+
 class _WBAvailableMixin:
     """Macht Entities automatisch 'unavailable', wenn die (eine) Wallbox offline ist."""
 
@@ -94,69 +111,29 @@ class _WBAvailableMixin:
         return bool(wb and wb.get("available", True))
 
 
-class MinPvPowerQuota(_WBAvailableMixin, NumberEntity):
-    def __init__(
-        self, client, device_info: DeviceInfo, initial, entry_id, wallbox_coord
-    ):
+class MinPvPowerQuota(_ChargeModeQuotaMixin, _WBAvailableMixin, NumberEntity):
+    _quota_key = "minpvpowerquota"
+
+    def __init__(self, device_info: DeviceInfo, initial, entry_id, wallbox_coord):
         _WBAvailableMixin.__init__(self, wallbox_coord)
-        self._entry_id = entry_id
-        self._client = client
+        self._init_quota(entry_id, initial)
         self._attr_name = "Min PV Power"
         self._attr_unique_id = f"{entry_id}_ksem_minpvpowerquota"
         self._attr_device_info = device_info
         self._attr_native_min_value = 0
         self._attr_native_max_value = 100
         self._attr_native_step = 10
-        self._value = int(initial or 0)
 
-    @property
-    def native_value(self):
-        return self._value
 
-    async def async_set_native_value(self, value: float):
-        await self._client.set_charge_mode(
-            mode=None,
-            minpvpowerquota=int(value),
-            mincharginpowerquota=None,
-            entry_id=self._entry_id,
-        )
-        self._value = int(value)
-        self.async_write_ha_state()
+class MinChargingPowerQuota(_ChargeModeQuotaMixin, _WBAvailableMixin, NumberEntity):
+    _quota_key = "mincharginpowerquota"
 
-    def update_value(self, value: int):
-        self._value = int(value)
-        self.async_write_ha_state()
-
-
-class MinChargingPowerQuota(_WBAvailableMixin, NumberEntity):
-    def __init__(
-        self, client, device_info: DeviceInfo, initial, entry_id, wallbox_coord
-    ):
+    def __init__(self, device_info: DeviceInfo, initial, entry_id, wallbox_coord):
         _WBAvailableMixin.__init__(self, wallbox_coord)
-        self._entry_id = entry_id
-        self._client = client
+        self._init_quota(entry_id, initial)
         self._attr_name = "Min Charging Power"
         self._attr_unique_id = f"{entry_id}_ksem_mincharginpowerquota"
         self._attr_device_info = device_info
         self._attr_native_min_value = 0
         self._attr_native_max_value = 100
         self._attr_native_step = 25
-        self._value = int(initial or 0)
-
-    @property
-    def native_value(self):
-        return self._value
-
-    async def async_set_native_value(self, value: float):
-        await self._client.set_charge_mode(
-            mode=None,
-            mincharginpowerquota=int(value),
-            minpvpowerquota=None,
-            entry_id=self._entry_id,
-        )
-        self._value = int(value)
-        self.async_write_ha_state()
-
-    def update_value(self, value: int):
-        self._value = int(value)
-        self.async_write_ha_state()
@@ -0,0 +1,90 @@
+"""Domainweiter Poll-Takt für viele Smartmeter-Einträge.
+
+Die Coordinators aller Einträge pollen auf einem gemeinsamen Raster, das die
+Einträge gleichmäßig über das Intervall verteilt. Gleichzeitig laufende Polls
+sind global begrenzt, REST-Requests zusätzlich je Host.
+"""
+
+import asyncio
+import contextlib
+import math
+
+SCHEDULER_KEY = "ksem_scheduler"  # hass.data-Schlüssel, getrennt von den Einträgen
+
+# höchstens so viele Polls (aller Einträge und Coordinators) gleichzeitig
+GLOBAL_POLL_CONCURRENCY = 8
+# höchstens so viele gleichzeitige REST-Requests je KSEM
+HTTP_REQUESTS_PER_HOST = 4
+# Coordinators je Eintrag (Smartmeter, Wallbox, Modbus) innerhalb des Versatzes
+LANES = 3
+
+
+class KsemPollScheduler:
+    """Verteilt Poll-Zeitpunkte und begrenzt gleichzeitige Geräte-I/O."""
+
+    def __init__(
+        self,
+        poll_concurrency: int = GLOBAL_POLL_CONCURRENCY,
+        requests_per_host: int = HTTP_REQUESTS_PER_HOST,
+    ):
+        self._io = asyncio.Semaphore(poll_concurrency)
+        self.waiting = 0  # Polls, die auf einen freien Platz warten
+        self._requests_per_host = requests_per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._entries: list[str] = []
+
+    def register(self, entry_id: str):
+        """Nimmt einen Eintrag in den Takt auf; liefert die Abmeldefunktion."""
+        if entry_id not in self._entries:
+            self._entries.append(entry_id)
+            self._entries.sort()
+
+        def _unregister():
+            if entry_id in self._entries:
+                self._entries.remove(entry_id)
+
+        return _unregister
+
+    @contextlib.asynccontextmanager
+    async def poll(self):
+        """Belegt für die Dauer eines Polls einen der globalen Plätze."""
+        self.waiting += 1
+        try:
+            await self._io.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            yield
+        finally:
+            self._io.release()
+
+    def host_limit(self, host: str) -> asyncio.Semaphore:
+        """Gemeinsame Begrenzung der REST-Requests an einen Host."""
+        limit = self._hosts.get(host)
+        if limit is None:
+            limit = self._hosts[host] = asyncio.Semaphore(self._requests_per_host)
+        return limit
+
+    def phase(self, entry_id: str, lane: int, interval: float) -> float:
+        """Versatz des Coordinators innerhalb des Intervalls (0 <= phase < interval)."""
+        try:
+            index = self._entries.index(entry_id)
+        except ValueError:
+            return 0.0
+        count = len(self._entries)
+        return ((index + lane / LANES) / count) % 1.0 * interval
+
+    def next_slot(self, entry_id: str, lane: int, interval: float, now: float) -> float:
+        """Nächster Rasterzeitpunkt, frühestens ein halbes Intervall nach now."""
+        phase = self.phase(entry_id, lane, interval)
+        due = phase + (math.floor((now - phase) / interval) + 1) * interval
+        if due - now < interval / 2:
+            due += interval
+        return due
+
+    def as_dict(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "polls_waiting": self.waiting,
+            "hosts": list(self._hosts),
+        }
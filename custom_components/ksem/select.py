@@ -1,11 +1,7 @@
-import asyncio
-import json
 import logging
 from typing import Optional
 
-from aiohttp import WSMsgType
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
@@ -39,8 +35,6 @@ async def async_setup_entry(hass, entry, async_add_entities):
             KsemChargeModeSelect(
                 hass=hass,
                 entry_id=entry.entry_id,
-                client=client,
-                token=None,  # Token wird im WS-Loop frisch geholt
                 coordinator=coordinator,
             )
         )
@@ -67,8 +61,6 @@ async def async_setup_entry(hass, entry, async_add_entities):
                 KsemChargeModeSelect(
                     hass=hass,
                     entry_id=entry.entry_id,
-                    client=client,
-                    token=None,
                     coordinator=coordinator,
                 ),
                 KsemPhaseSwitchSelect(
@@ -127,19 +119,16 @@ class KsemPhaseSwitchSelect(CoordinatorEntity, SelectEntity):
 
 
 class KsemChargeModeSelect(SelectEntity):
-    """Lademodus-Auswahl per WebSocket-Backfeed (nur eine WB)."""
+    """Lademodus-Auswahl über die Schreib-Warteschlange (nur eine WB)."""
 
-    def __init__(self, hass, entry_id, client, token, coordinator):
+    def __init__(self, hass, entry_id, coordinator):
         self._hass = hass
         self._entry_id = entry_id
-        self._client = client
-        self._token = token  # optional; im Loop jeweils frisch geholt
+        self._queue = hass.data[DOMAIN][entry_id]["chargemode_queue"]
         self._coord = coordinator  # für available()
         self._attr_name = "Wallbox Charge Mode"
         self._attr_unique_id = f"{entry_id}_ksem_charge_mode"
         self._attr_options = list(MODE_MAP.values())
-        self._api_mode: Optional[str] = None
-        self._ws_task: Optional[asyncio.Task] = None
 
     # DeviceInfo dynamisch: wenn WB existiert -> Wallbox, sonst Smartmeter
     @property
@@ -155,105 +144,13 @@ class KsemChargeModeSelect(SelectEntity):
 
     @property
     def current_option(self) -> Optional[str]:
-        return MODE_MAP.get(self._api_mode)
+        return MODE_MAP.get(self._queue.state.get("mode"))
 
     async def async_select_option(self, option: str):
         mode = REVERSE_MODE_MAP.get(option)
         if mode:
-            await self._client.set_charge_mode(
-                mode=mode,
-                minpvpowerquota=None,
-                mincharginpowerquota=None,
-                entry_id=self._entry_id,
-            )
-            self._api_mode = mode
-            self.async_write_ha_state()
+            await self._queue.async_set(mode=mode)
 
     async def async_added_to_hass(self) -> None:
-        if not self._ws_task:
-            self._ws_task = self._hass.loop.create_task(self._listen_websocket())
-
-    async def async_will_remove_from_hass(self) -> None:
-        if self._ws_task and not self._ws_task.done():
-            self._ws_task.cancel()
-            try:
-                await self._ws_task
-            except asyncio.CancelledError:
-                pass
-        self._ws_task = None
-
-    async def _listen_websocket(self):
-        url = f"ws://{self._client.host}/api/data-transfer/ws/json/json/local/config/e-mobility/chargemode"
-        session = async_get_clientsession(self._hass)
-
-        while True:
-            token = self._token or getattr(
-                getattr(self._client, "token", None), "access_token", None
-            )
-            if not token:
-                _LOGGER.warning(
-                    "Kein Token für WebSocket verfügbar – neuer Versuch in 30s."
-                )
-                await asyncio.sleep(30)
-                continue
-
-            try:
-                async with session.ws_connect(
-                    url, headers={"Authorization": f"Bearer {token}"}
-                ) as ws:
-                    await ws.send_str(f"Bearer {token}")
-                    _LOGGER.info("WebSocket verbunden für Lademodus")
-
-                    async for msg in ws:
-                        if msg.type == WSMsgType.TEXT:
-                            try:
-                                data = json.loads(msg.data)
-                            except Exception as e:
-                                _LOGGER.warning("WebSocket JSON decode error: %s", e)
-                                continue
-
-                            if not isinstance(data, dict):
-                                continue
-                            if not (data.get("topic", "") or "").endswith("chargemode"):
-                                continue
-
-                            msg_data = data.get("msg", {}) or {}
-                            mode = msg_data.get("mode")
-                            if mode and mode != self._api_mode:
-                                _LOGGER.debug("WebSocket Update: mode=%s", mode)
-                                self._api_mode = mode
-                                self.async_write_ha_state()
-
-                            # Quoten live an Numbers weiterreichen (falls vorhanden)
-                            quotas = self._hass.data[DOMAIN][self._entry_id].get(
-                                "quota_entities", {}
-                            )
-                            if "minpv" in quotas and "minpvpowerquota" in msg_data:
-                                quotas["minpv"].update_value(
-                                    msg_data["minpvpowerquota"]
-                                )
-                            if (
-                                "mincharge" in quotas
-                                and "mincharginpowerquota" in msg_data
-                            ):
-                                quotas["mincharge"].update_value(
-                                    msg_data["mincharginpowerquota"]
-                                )
-
-                            # Letzten Stand zwischenspeichern
-                            self._hass.data[DOMAIN][self._entry_id][
-                                "last_chargemode"
-                            ] = msg_data
-
-                        elif msg.type == WSMsgType.ERROR:
-                            _LOGGER.warning("WebSocket-Fehler: %s", msg)
-                            break
-
-            except asyncio.CancelledError:
-                _LOGGER.debug("WebSocket-Task wurde abgebrochen.")
-                break
-            except Exception as err:
-                _LOGGER.error("WebSocket-Verbindung fehlgeschlagen: %s", err)
-
-            _LOGGER.info("WebSocket getrennt, versuche Neuverbindung in 30 Sekunden...")
-            await asyncio.sleep(30)
+        # optimistische Änderungen und Geräteänderungen kommen über die Warteschlange
+        self.async_on_remove(self._queue.add_listener(self.async_write_ha_state))
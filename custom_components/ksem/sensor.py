@@ -1,17 +1,81 @@
 import logging
+from dataclasses import dataclass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import (
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from .const import DOMAIN
 from homeassistant.helpers.entity import EntityCategory
 from .modbus_map import SENSOR_DEFINITIONS
+from .snapshot import SLOTS
 from homeassistant.components.sensor import SensorDeviceClass
 from .helper import first_evse_from_coordinator  # <- Helper aus helper.py
+from .gdr import GDR_SENSORS
+from .stats import sensor_values
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 _LOGGER = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True, kw_only=True)
+class KsemModbusSensorEntityDescription(SensorEntityDescription):
+    """Beschreibung eines Modbus/OBIS-Sensors, einmalig aus SENSOR_DEFINITIONS erzeugt."""
+
+    address: int
+    device: str | None = None
+    mapping: dict | None = None  # Rohwert -> Text (ENUM)
+
+
+def _modbus_description(address: int, spec: dict) -> KsemModbusSensorEntityDescription:
+    mapping = spec.get("map")
+    if spec.get("device_class") == "enum":
+        return KsemModbusSensorEntityDescription(
+            key=spec["name"],
+            name=spec["name"],
+            address=address,
+            device=spec.get("device"),
+            mapping=mapping,
+            device_class=SensorDeviceClass.ENUM,
+            options=tuple(mapping.values()) if mapping else (),
+        )
+    device_class = spec.get("device_class")
+    if device_class == "energy" or spec.get("unit") in ("Wh", "kWh", "VAh", "varh"):
+        state_class = SensorStateClass.TOTAL_INCREASING
+    elif device_class in (
+        "power",
+        "voltage",
+        "current",
+        "battery",
+        "temperature",
+        "frequency",
+    ):
+        state_class = SensorStateClass.MEASUREMENT
+    else:
+        state_class = None
+    return KsemModbusSensorEntityDescription(
+        key=spec["name"],
+        name=spec["name"],
+        address=address,
+        device=spec.get("device"),
+        mapping=mapping,
+        device_class=device_class,
+        native_unit_of_measurement=spec["unit"],
+        state_class=state_class,
+    )
+
+
+# Adresse -> Beschreibung; wird beim Import einmal gebaut und von allen Entries geteilt
+MODBUS_SENSOR_DESCRIPTIONS = {
+    address: _modbus_description(address, spec)
+    for address, spec in SENSOR_DEFINITIONS.items()
+}
+
 SENSOR_TYPES = {
     "CpuLoad": ("CPU Load", "%"),
     "CpuTemp": ("CPU Temperature", "°C"),
@@ -23,6 +87,22 @@ SENSOR_TYPES = {
     "FlashDataTotal": ("Flash Data Total", "B"),
 }
 
+# Laufzeit-Kennzahlen der Integration (stats.py), aktualisiert mit dem Smartmeter-Poll
+STATS_SENSOR_TYPES = {
+    "modbus_poll_ms": ("Modbus Poll Duration", "ms", SensorStateClass.MEASUREMENT),
+    "modbus_bytes": ("Modbus Bytes Received", "B", SensorStateClass.TOTAL_INCREASING),
+    "rest_request_ms": ("REST Request Duration", "ms", SensorStateClass.MEASUREMENT),
+    "rest_bytes": ("REST Bytes Received", "B", SensorStateClass.TOTAL_INCREASING),
+    "rest_reauths": (
+        "REST Re-Authentications",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    "rest_cache_hits": ("REST Cache Hits", None, SensorStateClass.TOTAL_INCREASING),
+    "ws_reconnects": ("WebSocket Reconnects", None, SensorStateClass.TOTAL_INCREASING),
+    "ws_message_rate": ("WebSocket Messages", "1/min", SensorStateClass.MEASUREMENT),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -65,22 +145,38 @@ async def async_setup_entry(
         )
 
         wallbox_entities.append(
-            KsemWallboxSensor(uuid, f"{label} State", model, wb_serial, version, state)
+            KsemWallboxSensor(
+                wallbox, uuid, f"{label} State", model, wb_serial, version, state
+            )
+        )
+        wallbox_entities.extend(
+            KsemWallboxLiveSensor(
+                data["gdr_stream"], uuid, key, spec, wallbox_device_info
+            )
+            for key, spec in GDR_SENSORS.items()
         )
         wb_entities_created = True
 
     # 3) OBIS/Modbus-Entities (für device:"wallbox" nur, wenn WB-DeviceInfo existiert)
-    obis_entities = []
-    for addr, spec in SENSOR_DEFINITIONS.items():
-        info = (
+    obis_entities = [
+        KsemObisModbusSensor(
+            modbus,
+            description,
             wallbox_device_info
-            if spec.get("device") == "wallbox" and wallbox_device_info
-            else device_info
+            if description.device == "wallbox" and wallbox_device_info
+            else device_info,
         )
-        obis_entities.append(KsemObisModbusSensor(modbus, addr, spec, info))
+        for description in MODBUS_SENSOR_DESCRIPTIONS.values()
+    ]
 
     # 4) Optionaler WB-Leistungssensor: nur, wenn Coordinator existiert
-    more_entities = []
+    more_entities = [
+        KsemModbusConnectionSensor(modbus, data["modbus_client"], device_info, serial)
+    ]
+    more_entities.extend(
+        KsemStatsSensor(smart, data, key, spec, device_info, serial)
+        for key, spec in STATS_SENSOR_TYPES.items()
+    )
     if wallbox:
         evse_power_entity = KsemEvseAvailablePowerSensor(
             wallbox, wallbox_device_info or device_info
@@ -122,9 +218,15 @@ async def async_setup_entry(
             )
             new_entities = [
                 KsemWallboxSensor(
-                    uuid, f"{label} State", model, wb_serial, version, state
+                    wallbox, uuid, f"{label} State", model, wb_serial, version, state
                 )
             ]
+            new_entities.extend(
+                KsemWallboxLiveSensor(
+                    data["gdr_stream"], uuid, key, spec, wallbox_device_info
+                )
+                for key, spec in GDR_SENSORS.items()
+            )
             async_add_entities(new_entities)
             wb_entities_created = True
 
@@ -190,11 +292,82 @@ class KsemSmartmeterSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self):
-        return self.coordinator.data.get(self._sensor_key)
+        return (self.coordinator.data or {}).get(self._sensor_key)
+
 
+class KsemModbusConnectionSensor(CoordinatorEntity, SensorEntity):
+    """Zustand der Modbus-Verbindung inkl. Reconnect-Kennzahlen."""
+
+    def __init__(self, coordinator, modbus_client, device_info, serial):
+        super().__init__(coordinator)
+        self._health = modbus_client.health
+        self._attr_name = "Modbus Connection"
+        self._attr_unique_id = f"{serial}_modbus_connection"
+        self._attr_device_info = device_info
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    @property
+    def available(self) -> bool:
+        # meldet den Zustand gerade auch dann, wenn der Poll fehlschlägt
+        return True
+
+    @property
+    def native_value(self):
+        return self._health.state
+
+    @property
+    def extra_state_attributes(self):
+        interval = self.coordinator.update_interval
+        return {
+            **self._health.as_dict(),
+            "poll_interval": interval.total_seconds() if interval else None,
+        }
 
-class KsemWallboxSensor(SensorEntity):
-    def __init__(self, uuid, name, model, serial, version, value):
+
+class KsemStatsSensor(CoordinatorEntity, SensorEntity):
+    """Laufzeit-Kennzahl (Latenz, Datenmenge, Reconnects) der Integration."""
+
+    # ändern sich mit jedem Poll; nicht bei jedem State in den Recorder schreiben
+    _unrecorded_attributes = frozenset({"errors", "max_ms", "retries", "not_modified"})
+
+    def __init__(self, coordinator, data, key, spec, device_info, serial):
+        super().__init__(coordinator)
+        name, unit, state_class = spec
+        self._modbus_stats = data["modbus_client"].stats
+        self._rest_stats = data["client"].stats
+        self._ws_hub = data["ws_hub"]
+        self._sensor_key = key
+        self._attr_name = name
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_unique_id = f"{serial}_{key}"
+        self._attr_device_info = device_info
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._update_value()
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def _update_value(self):
+        # einmal je Coordinator-Update statt je Property-Zugriff berechnen
+        value, attributes = sensor_values(
+            self._modbus_stats, self._rest_stats, self._ws_hub
+        )[self._sensor_key]
+        self._attr_native_value = round(value, 1) if isinstance(value, float) else value
+        self._attr_extra_state_attributes = attributes
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_value()
+        super()._handle_coordinator_update()
+
+
+class KsemWallboxSensor(CoordinatorEntity, SensorEntity):
+    """State der Wallbox; folgt dem Wallbox-Coordinator (Push-Events und REST)."""
+
+    def __init__(self, coordinator, uuid, name, model, serial, version, value):
+        super().__init__(coordinator)
         self._attr_name = name
         self._attr_unique_id = f"{uuid}_state"
         self._uuid = uuid
@@ -205,6 +378,9 @@ class KsemWallboxSensor(SensorEntity):
 
     @property
     def state(self):
+        for wb in (self.coordinator.data or {}).get("evse") or []:
+            if wb.get("uuid") == self._uuid:
+                return wb.get("state", self._state)
         return self._state
 
     @property
@@ -223,47 +399,58 @@ class KsemWallboxSensor(SensorEntity):
         }
 
 
-class KsemObisModbusSensor(CoordinatorEntity, SensorEntity):
-    def __init__(self, coordinator, address, spec, device_info):
-        super().__init__(coordinator)
-        self._address = address
-        self._key = spec["name"]
-        self._mapping = spec.get("map")
-        self._attr_name = f"{spec['name']}"
+class KsemWallboxLiveSensor(SensorEntity):
+    """Live-Wert der Wallbox aus dem GDR-Stream (Push, kein Polling)."""
+
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, stream, uuid, key, spec, device_info):
+        self._stream = stream
+        self._uuid = uuid
+        self._key = key
+        self._attr_name = spec["name"]
         self._attr_native_unit_of_measurement = spec["unit"]
-        # ENUM-Erkennung
-        if spec.get("device_class") == "enum":
-            self._attr_device_class = SensorDeviceClass.ENUM
-            self._attr_options = list(self._mapping.values()) if self._mapping else []
-            self._attr_native_unit_of_measurement = None
-            self._attr_state_class = None
-        else:
-            self._attr_device_class = spec.get("device_class")
-            if spec.get("device_class") == "energy" or spec.get("unit") in (
-                "Wh",
-                "kWh",
-                "VAh",
-                "varh",
-            ):
-                self._attr_state_class = SensorStateClass.TOTAL_INCREASING
-            elif spec.get("device_class") in (
-                "power",
-                "voltage",
-                "current",
-                "battery",
-                "temperature",
-                "frequency",
-            ):
-                self._attr_state_class = SensorStateClass.MEASUREMENT
-            else:
-                self._attr_state_class = None
+        self._attr_device_class = spec["device_class"]
+        self._attr_unique_id = f"wallbox-{uuid}_gdr_{key}"
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        return self._stream.connected and self.native_value is not None
+
+    @property
+    def native_value(self):
+        return self._stream.values.get(self._uuid, {}).get(self._key)
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self._stream.signal, self._on_push)
+        )
+
+    @callback
+    def _on_push(self, uuid, changed: dict) -> None:
+        if uuid is None or (uuid == self._uuid and self._key in changed):
+            self.async_write_ha_state()
+
+
+class KsemObisModbusSensor(CoordinatorEntity, SensorEntity):
+    entity_description: KsemModbusSensorEntityDescription
+
+    def __init__(self, coordinator, description, device_info):
+        # Kontext = Sensorname: nur bei geändertem Wert benachrichtigen
+        super().__init__(coordinator, context=description.key)
+        self.entity_description = description
+        self._slot = SLOTS[description.key]
+        self._mapping = description.mapping
         ident = next(iter(device_info["identifiers"]))[1]
-        self._attr_unique_id = f"{ident}_obis_{address}"
+        self._attr_unique_id = f"{ident}_obis_{description.address}"
         self._attr_device_info = device_info
 
     @property
     def native_value(self):
-        val = self.coordinator.data.get(self._key)
-        if self._mapping:
+        data = self.coordinator.data
+        val = data.value(self._slot) if data is not None else None
+        if self._mapping and val is not None:
             return self._mapping.get(int(val), f"Unbekannt ({val})")
         return val
@@ -0,0 +1,90 @@
+"""Kompakter Snapshot der Modbus-Werte: ein array('d') mit festem Slot je Definition."""
+
+import math
+from array import array
+from collections.abc import Mapping
+
+from .modbus_map import SENSOR_DEFINITIONS
+
+NAN = math.nan
+
+# Sensorname -> Slot; Reihenfolge wie in SENSOR_DEFINITIONS
+SLOTS = {spec["name"]: slot for slot, spec in enumerate(SENSOR_DEFINITIONS.values())}
+SLOT_NAMES = tuple(SLOTS)
+SLOT_COUNT = len(SLOT_NAMES)
+
+# Unskalierte Ganzzahltypen werden wie bisher als int gemeldet
+INT_SLOTS = frozenset(
+    slot
+    for slot, spec in enumerate(SENSOR_DEFINITIONS.values())
+    if spec["type"] != "float32" and spec.get("scale") in (None, 1)
+)
+
+
+def empty_values() -> array:
+    """Neuer Wertepuffer, alle Slots fehlend (NaN)."""
+    return array("d", [NAN]) * SLOT_COUNT
+
+
+class ModbusSnapshot(Mapping):
+    """Unveränderlicher Stand aller Modbus-Werte eines Polls.
+
+    Entities lesen per Slot (value); get(name) bleibt für bestehenden Code
+    erhalten. NaN bedeutet: Wert fehlt.
+    """
+
+    __slots__ = ("_values",)
+
+    def __init__(self, values: array | None = None):
+        self._values = values if values is not None else empty_values()
+
+    def value(self, slot: int):
+        val = self._values[slot]
+        if val != val:  # NaN
+            return None
+        return int(val) if slot in INT_SLOTS else val
+
+    def __getitem__(self, name: str):
+        val = self.value(SLOTS[name])
+        if val is None:
+            raise KeyError(name)
+        return val
+
+    def get(self, name: str, default=None):
+        slot = SLOTS.get(name)
+        if slot is None:
+            return default
+        val = self.value(slot)
+        return default if val is None else val
+
+    def __iter__(self):
+        values = self._values
+        return (name for name, val in zip(SLOT_NAMES, values) if val == val)
+
+    def __len__(self) -> int:
+        return sum(1 for val in self._values if val == val)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ModbusSnapshot):
+            return not self.changed_slots(other)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def changed_slots(self, other: "ModbusSnapshot | None") -> list:
+        """Slots, deren Wert sich gegenüber other unterscheidet (NaN == NaN)."""
+        if other is None:
+            return list(range(SLOT_COUNT))
+        return [
+            slot
+            for slot, (new, old) in enumerate(zip(self._values, other._values))
+            if new != old and (new == new or old == old)
+        ]
+
+    @property
+    def raw(self) -> array:
+        """Der zugrundeliegende Puffer (nur lesen)."""
+        return self._values
+
+    def __repr__(self) -> str:
+        return f"ModbusSnapshot({dict(self)})"
@@ -0,0 +1,156 @@
+"""Laufzeit-Kennzahlen der Hot Paths: Modbus-Blöcke, REST-Endpunkte, WebSocket.
+
+Erfasst wird nur mit perf_counter und ein paar Additionen je Aufruf; die
+Auswertung (Diagnose-Sensoren, Diagnose-Download) rechnet beim Lesen.
+"""
+
+import math
+import time
+
+# Glättung der mittleren Dauer (exponentiell gleitender Mittelwert)
+EWMA_ALPHA = 0.2
+# Zeitkonstante der Nachrichtenrate in Sekunden
+RATE_WINDOW_S = 60.0
+
+
+class TimingStats:
+    """Dauer, Fehler und Nutzdaten eines Aufrufpfads."""
+
+    __slots__ = ("count", "errors", "bytes", "last_ms", "avg_ms", "max_ms")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.last_ms: float | None = None
+        self.avg_ms: float | None = None
+        self.max_ms = 0.0
+
+    def record(self, seconds: float, nbytes: int = 0):
+        ms = seconds * 1000
+        self.count += 1
+        self.bytes += nbytes
+        self.last_ms = ms
+        self.avg_ms = (
+            ms if self.avg_ms is None else self.avg_ms + EWMA_ALPHA * (ms - self.avg_ms)
+        )
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def failed(self):
+        self.errors += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "last_ms": None if self.last_ms is None else round(self.last_ms, 1),
+            "avg_ms": None if self.avg_ms is None else round(self.avg_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class RateMeter:
+    """Ereignisrate mit exponentiellem Abklingen (ohne Puffer je Ereignis)."""
+
+    __slots__ = ("_rate", "_last")
+
+    def __init__(self):
+        self._rate = 0.0  # Ereignisse pro Sekunde zum Zeitpunkt _last
+        self._last = time.monotonic()
+
+    def mark(self):
+        now = time.monotonic()
+        self._rate = self._rate * math.exp((self._last - now) / RATE_WINDOW_S)
+        self._rate += 1 / RATE_WINDOW_S
+        self._last = now
+
+    @property
+    def per_minute(self) -> float:
+        decay = math.exp((self._last - time.monotonic()) / RATE_WINDOW_S)
+        return self._rate * decay * 60
+
+
+class KeyedTimings(dict):
+    """TimingStats je Schlüssel (Block, Endpunkt), bei Bedarf angelegt."""
+
+    def __missing__(self, key) -> TimingStats:
+        stats = self[key] = TimingStats()
+        return stats
+
+    def total_bytes(self) -> int:
+        return sum(stats.bytes for stats in self.values())
+
+    def as_dict(self) -> dict:
+        return {str(key): stats.as_dict() for key, stats in self.items()}
+
+
+class ModbusStats:
+    """Poll-Dauer und Latenz je Registerblock."""
+
+    def __init__(self):
+        self.poll = TimingStats()
+        self.blocks = KeyedTimings()  # Schlüssel: "start-ende"
+
+    def as_dict(self) -> dict:
+        return {"poll": self.poll.as_dict(), "blocks": self.blocks.as_dict()}
+
+
+class RestStats:
+    """Latenz je Endpunkt sowie Wiederholungen und Neuanmeldungen."""
+
+    def __init__(self):
+        self.endpoints = KeyedTimings()  # Schlüssel: "GET /api/..."
+        self.retries = 0
+        self.reauths = 0
+        self.cache_hits = 0  # ohne Request aus dem Zwischenspeicher beantwortet
+        self.not_modified = 0  # bedingter Request mit 304-Antwort
+
+    def summary(self) -> TimingStats:
+        """Alle Endpunkte zusammengefasst (gewichteter Mittelwert)."""
+        total = TimingStats()
+        weighted = 0.0
+        for stats in self.endpoints.values():
+            total.count += stats.count
+            total.errors += stats.errors
+            total.bytes += stats.bytes
+            total.max_ms = max(total.max_ms, stats.max_ms)
+            if stats.avg_ms is not None:
+                weighted += stats.avg_ms * stats.count
+        if total.count:
+            total.avg_ms = weighted / total.count
+        return total
+
+    def as_dict(self) -> dict:
+        return {
+            "retries": self.retries,
+            "reauths": self.reauths,
+            "cache_hits": self.cache_hits,
+            "not_modified": self.not_modified,
+            "endpoints": self.endpoints.as_dict(),
+        }
+
+
+def sensor_values(modbus: ModbusStats, rest: RestStats, ws_hub) -> dict:
+    """Werte und Attribute der Diagnose-Sensoren (Schlüssel wie STATS_SENSOR_TYPES).
+
+    Nur kleine Attribute; Details je Block/Endpunkt/Stream stehen in der Diagnose.
+    """
+    rest_total = rest.summary()
+    return {
+        "modbus_poll_ms": (
+            modbus.poll.avg_ms,
+            {"errors": modbus.poll.errors, "max_ms": round(modbus.poll.max_ms, 1)},
+        ),
+        "modbus_bytes": (modbus.blocks.total_bytes(), None),
+        "rest_request_ms": (
+            rest_total.avg_ms,
+            {"errors": rest_total.errors, "max_ms": round(rest_total.max_ms, 1)},
+        ),
+        "rest_bytes": (rest_total.bytes, None),
+        "rest_reauths": (rest.reauths, {"retries": rest.retries}),
+        "rest_cache_hits": (rest.cache_hits, {"not_modified": rest.not_modified}),
+        "ws_reconnects": (ws_hub.reconnects, None),
+        "ws_message_rate": (round(ws_hub.messages_per_minute, 1), None),
+    }
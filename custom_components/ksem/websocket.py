@@ -0,0 +1,272 @@
+"""Gemeinsamer WebSocket-Hub: eine Verbindung je Stream, Verteilung nach Topic."""
+
+import asyncio
+import datetime
+import json
+import logging
+import random
+import time
+from collections.abc import Callable
+
+from aiohttp import WSMsgType, WSServerHandshakeError
+from homeassistant.core import callback
+
+from .helper import LogThrottle, bearer_header
+from .stats import RateMeter, TimingStats
+
+_LOGGER = logging.getLogger(__name__)
+
+WS_BASE_PATH = "/api/data-transfer/ws/"
+# Reconnect mit exponentiellem Backoff (mit Jitter), Start unter einer Sekunde
+WS_RECONNECT_BASE_S = 0.5
+WS_RECONNECT_MAX_S = 60.0
+# erst nach so langer stabiler Verbindung beginnt der Backoff wieder von vorn
+WS_STABLE_S = 30.0
+# Ping/Pong erkennt tote Verbindungen statt auf TCP-Timeouts zu warten
+WS_HEARTBEAT_S = 15.0
+# Token vor dem Verbinden erneuern, wenn er bald abläuft
+WS_TOKEN_MIN_VALID = datetime.timedelta(minutes=5)
+# Close-Codes, mit denen der KSEM einen ungültigen Token ablehnt
+WS_AUTH_CLOSE_CODES = (1008, 4001, 4401, 4403)
+
+# Stream-Pfade (nach /ws/), siehe api.md
+CHARGEMODE_PATH = "json/json/local/config/e-mobility/chargemode"
+EVSE_STATE_PATH = "json/json/local/evse/+/state"
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+    """MQTT-artiger Vergleich; '+' steht für genau eine Ebene."""
+    pattern_parts = pattern.split("/")
+    topic_parts = topic.split("/")
+    if len(pattern_parts) != len(topic_parts):
+        return False
+    return all(p in ("+", t) for p, t in zip(pattern_parts, topic_parts))
+
+
+class _Stream:
+    """Eine WebSocket-Verbindung und ihre Listener."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.json = path.startswith("json/")
+        # Topic-Muster der Nachrichten: Pfad ohne Ausgabeformat-Präfix
+        self.pattern = path.removeprefix("json/") if self.json else path
+        self.listeners: list[tuple[Callable, Callable | None]] = []
+        self.task: asyncio.Task | None = None
+        self.connected = False
+        self.connects = 0
+        self.failures = 0  # aufeinanderfolgende Fehlschläge
+        self.messages = 0
+        self.bytes = 0
+        self.rate = RateMeter()
+        self.dispatch = TimingStats()  # Verarbeitungszeit je Nachricht
+        self.last_error: str | None = None
+        self.retry_at = 0.0  # monotonic
+
+    def backoff(self) -> float:
+        """Wartezeit vor dem nächsten Verbindungsversuch."""
+        self.failures += 1
+        delay = min(WS_RECONNECT_MAX_S, WS_RECONNECT_BASE_S * 2 ** (self.failures - 1))
+        delay *= random.uniform(0.5, 1.0)
+        self.retry_at = time.monotonic() + delay
+        return delay
+
+    def as_dict(self) -> dict:
+        return {
+            "connected": self.connected,
+            "listeners": len(self.listeners),
+            "reconnects": max(0, self.connects - 1),
+            "consecutive_failures": self.failures,
+            "messages": self.messages,
+            "messages_per_min": round(self.rate.per_minute, 1),
+            "bytes": self.bytes,
+            "dispatch": self.dispatch.as_dict(),
+            "last_error": self.last_error,
+            "retry_in": round(max(0.0, self.retry_at - time.monotonic()), 1),
+        }
+
+
+class KsemWebSocketHub:
+    """Hält je Stream-Pfad genau eine Verbindung (Auth, Reconnect) pro Config-Entry.
+
+    Listener melden sich mit dem Pfad nach /ws/ an, z. B.
+    "json/json/local/evse/+/state". JSON wird einmal pro Nachricht geparst und
+    als (topic, msg) verteilt, Binärdaten (Protobuf) als (pfad, bytes).
+    """
+
+    def __init__(self, hass, entry, client):
+        self._hass = hass
+        self._entry = entry
+        self._client = client
+        self._streams: dict[str, _Stream] = {}
+        self._log = LogThrottle(_LOGGER)  # Warnungen je Stream während Ausfällen
+
+    @callback
+    def subscribe(
+        self,
+        path: str,
+        message_callback: Callable,
+        status_callback: Callable | None = None,
+    ) -> Callable:
+        """Registriert einen Listener und startet die Verbindung bei Bedarf.
+
+        status_callback(connected) wird bei Verbindungswechseln aufgerufen.
+        Liefert eine Funktion zum Abmelden.
+        """
+        stream = self._streams.get(path)
+        if stream is None:
+            stream = self._streams[path] = _Stream(path)
+        listener = (message_callback, status_callback)
+        stream.listeners.append(listener)
+        if stream.task is None or stream.task.done():
+            stream.task = self._entry.async_create_background_task(
+                self._hass, self._run(stream), f"ksem websocket {path}"
+            )
+
+        @callback
+        def _unsubscribe():
+            if listener in stream.listeners:
+                stream.listeners.remove(listener)
+
+        return _unsubscribe
+
+    def is_connected(self, path: str) -> bool:
+        stream = self._streams.get(path)
+        return bool(stream and stream.connected)
+
+    def as_dict(self) -> dict:
+        return {path: stream.as_dict() for path, stream in self._streams.items()}
+
+    @property
+    def reconnects(self) -> int:
+        return sum(max(0, s.connects - 1) for s in self._streams.values())
+
+    @property
+    def messages_per_minute(self) -> float:
+        return sum(s.rate.per_minute for s in self._streams.values())
+
+    async def async_stop(self):
+        for stream in self._streams.values():
+            stream.listeners.clear()  # beim Entladen keine Status-Callbacks mehr
+        tasks = [s.task for s in self._streams.values() if s.task and not s.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _set_connected(self, stream: _Stream, connected: bool):
+        if connected == stream.connected:
+            return
+        stream.connected = connected
+        for _, status_callback in list(stream.listeners):
+            if status_callback:
+                status_callback(connected)
+
+    def _dispatch(self, stream: _Stream, data):
+        stream.messages += 1
+        stream.bytes += len(data)
+        stream.rate.mark()
+        if not stream.json:
+            for message_callback, _ in list(stream.listeners):
+                message_callback(stream.path, data)
+            return
+        try:
+            message = json.loads(data)
+        except ValueError as err:
+            self._log.warning(
+                ("json", stream.path), "WebSocket JSON decode error: %s", err
+            )
+            return
+        if not isinstance(message, dict):
+            return
+        topic = message.get("topic") or ""
+        if not topic_matches(stream.pattern, topic):
+            return
+        msg = message.get("msg") or {}
+        for message_callback, _ in list(stream.listeners):
+            message_callback(topic, msg)
+
+    async def _token(self):
+        token = await self._client.async_get_token()
+        if token.expire_date - datetime.datetime.now() < WS_TOKEN_MIN_VALID:
+            token = await self._client.async_invalidate_token(token)
+        return token
+
+    async def _run(self, stream: _Stream):
+        url = f"ws://{self._client.host}{WS_BASE_PATH}{stream.path}"
+        session = self._client.session()
+
+        while True:
+            token = None
+            auth_rejected = False
+            connected_at = None
+            try:
+                token = await self._token()
+                async with session.ws_connect(
+                    url,
+                    headers=bearer_header(token.access_token),
+                    heartbeat=WS_HEARTBEAT_S,
+                ) as ws:
+                    await ws.send_str(f"Bearer {token.access_token}")
+                    connected_at = time.monotonic()
+                    stream.connects += 1
+                    self._set_connected(stream, True)
+                    # erste Verbindung und Ende eines Ausfalls melden, sonst nur DEBUG
+                    if self._log.clear(stream.path) or stream.connects == 1:
+                        _LOGGER.info("WebSocket verbunden: %s", stream.path)
+                    else:
+                        _LOGGER.debug("WebSocket verbunden: %s", stream.path)
+
+                    async for msg in ws:
+                        if msg.type in (WSMsgType.TEXT, WSMsgType.BINARY):
+                            began = time.perf_counter()
+                            try:
+                                self._dispatch(stream, msg.data)
+                            except Exception:
+                                stream.dispatch.failed()
+                                _LOGGER.exception(
+                                    "Fehler beim Verarbeiten von %s", stream.path
+                                )
+                            else:
+                                stream.dispatch.record(time.perf_counter() - began)
+                        elif msg.type == WSMsgType.ERROR:
+                            _LOGGER.warning("WebSocket-Fehler: %s", msg)
+                            break
+                    auth_rejected = ws.close_code in WS_AUTH_CLOSE_CODES
+                    stream.last_error = f"geschlossen (Code {ws.close_code})"
+
+            except asyncio.CancelledError:
+                _LOGGER.debug("WebSocket-Task %s wurde abgebrochen.", stream.path)
+                raise
+            except WSServerHandshakeError as err:
+                auth_rejected = err.status in (401, 403)
+                stream.last_error = str(err) or type(err).__name__
+                self._log.warning(
+                    stream.path, "WebSocket %s abgelehnt: %s", stream.path, err
+                )
+            except Exception as err:
+                stream.last_error = str(err) or type(err).__name__
+                self._log.warning(
+                    stream.path,
+                    "WebSocket-Verbindung %s fehlgeschlagen: %s",
+                    stream.path,
+                    err,
+                )
+            finally:
+                self._set_connected(stream, False)
+
+            if connected_at and time.monotonic() - connected_at >= WS_STABLE_S:
+                stream.failures = 0  # stabile Verbindung: Backoff zurücksetzen
+            if auth_rejected and token:
+                # Token abgelehnt: vor dem nächsten Versuch neu anmelden
+                try:
+                    await self._client.async_invalidate_token(token)
+                except Exception as err:
+                    _LOGGER.debug("Neuanmeldung fehlgeschlagen: %s", err)
+
+            delay = stream.backoff()
+            _LOGGER.debug(
+                "WebSocket %s getrennt, versuche Neuverbindung in %.1f Sekunden...",
+                stream.path,
+                delay,
+            )
+            await asyncio.sleep(delay)
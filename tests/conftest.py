@@ -0,0 +1,8 @@
+"""Gemeinsame Einstellungen: Repo-Wurzel und tools/ importierbar machen."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
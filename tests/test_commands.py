@@ -0,0 +1,104 @@
+"""KsemChargeModeQueue: Sammeln, ein PUT mit vollem Stand, Bestätigung, Rollback."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.ksem.commands import KsemChargeModeQueue
+
+CONFIRMED = {"mode": "lock", "minpvpowerquota": 0, "mincharginpowerquota": 0}
+
+
+class FakeClient:
+    def __init__(self):
+        self.puts = []
+        self.fail = False
+
+    async def set_charge_mode(self, **kwargs):
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("offline")
+        self.puts.append(kwargs)
+
+
+def _queue(client):
+    loop = asyncio.get_running_loop()
+    hass = MagicMock()
+    hass.loop = loop
+    entry = MagicMock()
+    entry.entry_id = "entry"
+    entry.async_create_background_task = lambda hass, target, name: loop.create_task(
+        target
+    )
+    return KsemChargeModeQueue(hass, entry, client, confirmed=CONFIRMED, debounce=0.01)
+
+
+def test_changes_are_coalesced_into_one_put():
+    async def run():
+        client = FakeClient()
+        queue = _queue(client)
+        await asyncio.gather(
+            queue.async_set(minpvpowerquota=10),
+            queue.async_set(minpvpowerquota=30),
+            queue.async_set(mode="pv"),
+        )
+        return client.puts, queue.state
+
+    puts, state = asyncio.run(run())
+    assert puts == [
+        {
+            "mode": "pv",
+            "minpvpowerquota": 30,
+            "mincharginpowerquota": 0,
+            "entry_id": "entry",
+        }
+    ]
+    assert state == {"mode": "pv", "minpvpowerquota": 30, "mincharginpowerquota": 0}
+
+
+def test_successful_put_is_confirmed_without_echo():
+    async def run():
+        queue = _queue(FakeClient())
+        notified = []
+        queue.add_listener(lambda: notified.append(queue.state["mode"]))
+        await queue.async_set(mode="pv")
+        await asyncio.sleep(0.05)  # kein WebSocket-Echo
+        return queue.state, notified
+
+    state, notified = asyncio.run(run())
+    assert state["mode"] == "pv"
+    assert notified[0] == "pv"  # optimistisch sofort
+    assert notified[-1] == "pv"
+
+
+def test_failed_put_rolls_back_and_raises():
+    async def run():
+        client = FakeClient()
+        client.fail = True
+        queue = _queue(client)
+        with pytest.raises(HomeAssistantError):
+            await queue.async_set(mode="pv", minpvpowerquota=50)
+        return queue.state
+
+    assert asyncio.run(run()) == CONFIRMED
+
+
+def test_stream_update_replaces_confirmed_state():
+    async def run():
+        queue = _queue(FakeClient())
+        queue.handle_chargemode("topic", {**CONFIRMED, "mode": "grid"})
+        return queue.state
+
+    assert asyncio.run(run())["mode"] == "grid"
+
+
+def test_unknown_and_empty_changes_are_ignored():
+    async def run():
+        client = FakeClient()
+        queue = _queue(client)
+        await queue.async_set(mode=None, other=1)
+        return client.puts
+
+    assert asyncio.run(run()) == []
@@ -0,0 +1,46 @@
+"""Protobuf-GDR-Dekodierung (Varints, längenbegrenzte Felder, Maps)."""
+
+import pytest
+from fake_ksem import encode_gdrs
+
+from custom_components.ksem.gdr import _varint, iter_fields, iter_gdrs
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 2**32 + 5, 2**63 - 1])
+def test_varint_roundtrip(value):
+    out = bytearray()
+    rest = value
+    while True:
+        byte = rest & 0x7F
+        rest >>= 7
+        out.append(byte | (0x80 if rest else 0))
+        if not rest:
+            break
+    assert _varint(memoryview(bytes(out)), 0) == (value, len(out))
+
+
+def test_length_delimited_field_is_a_view():
+    fields = list(iter_fields(b"\x0a\x03abc\x10\x05"))
+    assert [(field, wire) for field, wire, _ in fields] == [(1, 2), (2, 0)]
+    assert bytes(fields[0][2]) == b"abc"
+    assert fields[1][2] == 5
+
+
+def test_frame_from_fake_ksem_decodes():
+    frame = encode_gdrs(
+        {
+            "wb-1": {"1-0:32.4.0*255": 231, "1-0:1.4.0*255": 11000},
+            "wb-2": {"1-0:31.4.0*255": 16},
+        }
+    )
+    gdrs = {gdr["id"]: gdr for gdr in iter_gdrs(frame)}
+    assert set(gdrs) == {"wb-1", "wb-2"}
+    assert gdrs["wb-1"]["values"] == {"1-0:32.4.0*255": 231, "1-0:1.4.0*255": 11000}
+    assert gdrs["wb-2"]["status"] == 1
+    assert gdrs["wb-2"]["values"] == {"1-0:31.4.0*255": 16}
+
+
+def test_truncated_frame_raises():
+    frame = encode_gdrs({"wb-1": {"1-0:32.4.0*255": 231}})
+    with pytest.raises((ValueError, IndexError)):
+        list(iter_gdrs(frame[:-3]))
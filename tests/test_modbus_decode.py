@@ -0,0 +1,54 @@
+"""Vorkompilierter Leseplan: Blocklayout und Dekodierung in einem Schritt."""
+
+import struct
+
+import pytest
+
+from custom_components.ksem.modbus_helper import (
+    MAX_READ_REGISTERS,
+    REGISTER_TYPES,
+    compile_read_plan,
+    decode_block,
+    register_size,
+)
+from custom_components.ksem.modbus_map import SENSOR_DEFINITIONS
+from custom_components.ksem.snapshot import SLOTS, empty_values
+
+
+def test_read_plan_covers_every_definition_once():
+    slots = [
+        slot for block in compile_read_plan(SENSOR_DEFINITIONS) for slot in block.slots
+    ]
+    assert sorted(slots) == sorted(SLOTS.values())
+
+
+def test_compiled_blocks_match_their_register_layout():
+    for block in compile_read_plan(SENSOR_DEFINITIONS):
+        assert block.values.size == block.count * 2 <= MAX_READ_REGISTERS * 2
+        used = set()
+        for offset in block.offsets:
+            size = register_size(SENSOR_DEFINITIONS[block.start + offset]["type"])
+            used.update(range(block.start + offset, block.start + offset + size))
+        for gap_start, gap_end in block.gaps:
+            assert not used.intersection(range(gap_start, gap_end))
+
+
+def test_decode_block_scales_and_keeps_sign():
+    # Negativer Wert für vorzeichenbehaftete Typen, großer Zähler für uint64
+    samples = {"int32": -1234, "uint16": 1234, "uint32": 123456, "uint64": 2**40 + 7}
+    for block in compile_read_plan(SENSOR_DEFINITIONS):
+        payload = bytearray(block.count * 2)
+        expected = {}
+        for name, offset in zip(block.names, block.offsets):
+            spec = SENSOR_DEFINITIONS[block.start + offset]
+            raw = samples[spec["type"]]
+            struct.pack_into(
+                ">" + REGISTER_TYPES[spec["type"]][1], payload, offset * 2, raw
+            )
+            expected[SLOTS[name]] = raw * spec.get("scale", 1)
+
+        values = empty_values()
+        decode_block(block, memoryview(payload), values)
+
+        for slot, value in expected.items():
+            assert values[slot] == pytest.approx(value)
@@ -0,0 +1,60 @@
+"""Pipelining-Fallback gegen ein Gateway, das überlappende Requests nicht verträgt."""
+
+import asyncio
+import struct
+
+from custom_components.ksem.modbus_health import ModbusConnectionHealth
+from custom_components.ksem.modbus_helper import KsemModbusClient
+
+REQUEST = struct.Struct(">HHHBBHH")
+
+
+async def _serve_one_at_a_time(reader, writer):
+    """Beantwortet FC3 mit Nullen, trennt aber bei einem zweiten offenen Request."""
+    try:
+        while True:
+            request = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+            tid, _, _, unit, fc, _, count = request
+            try:
+                await asyncio.wait_for(reader.readexactly(REQUEST.size), timeout=0.005)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                writer.close()  # überlappender Request: Verbindung fallen lassen
+                return
+            data = bytes(2 * count)
+            writer.write(
+                struct.pack(">HHHBBB", tid, 0, 3 + len(data), unit, fc, len(data))
+                + data
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+
+def test_falls_back_to_pool_when_gateway_drops_overlapping_requests():
+    async def run():
+        server = await asyncio.start_server(_serve_one_at_a_time, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = KsemModbusClient("127.0.0.1", port=port, window=4)
+        client.health = ModbusConnectionHealth(base=0.01, maximum=0.01)
+        snapshot = None
+        try:
+            for _ in range(10):
+                try:
+                    snapshot = await client.read_all()
+                except ConnectionError:
+                    await asyncio.sleep(0.02)
+                    continue
+                if not client.pipelined:
+                    break
+        finally:
+            await client.disconnect()
+            server.close()
+            await server.wait_closed()
+        return client.pipelined, snapshot
+
+    pipelined, snapshot = asyncio.run(run())
+    assert not pipelined
+    assert snapshot is not None
+    assert snapshot["Active Power+"] == 0
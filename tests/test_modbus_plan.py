@@ -0,0 +1,38 @@
+"""Blockplanung: Kostenmodell, Request-Limit und abgelehnte Lücken."""
+
+from custom_components.ksem.modbus_helper import (
+    MAX_READ_REGISTERS,
+    plan_register_blocks,
+)
+
+
+def _defs(*entries):
+    """Minimale Definitionen: (Adresse, Typ)."""
+    return {addr: {"name": f"r{addr}", "type": dtype} for addr, dtype in entries}
+
+
+def test_small_gap_is_read_along():
+    blocks = plan_register_blocks(_defs((0, "uint32"), (4, "uint32")))
+    assert blocks == [[(0, 2), (4, 2)]]
+
+
+def test_large_gap_splits_block():
+    # 200 Register Lücke kosten mehr als ein weiterer Roundtrip
+    blocks = plan_register_blocks(_defs((0, "uint32"), (202, "uint32")))
+    assert blocks == [[(0, 2)], [(202, 2)]]
+
+
+def test_block_respects_request_limit():
+    defs = _defs(*((addr, "uint64") for addr in range(0, 200, 4)))
+    blocks = plan_register_blocks(defs)
+    assert len(blocks) > 1
+    for block in blocks:
+        start = block[0][0]
+        end = block[-1][0] + block[-1][1]
+        assert end - start <= MAX_READ_REGISTERS
+
+
+def test_unreadable_gap_is_not_read_along():
+    defs = _defs((0, "uint32"), (4, "uint32"), (8, "uint32"))
+    blocks = plan_register_blocks(defs, unreadable=frozenset({6}))
+    assert blocks == [[(0, 2), (4, 2)], [(8, 2)]]
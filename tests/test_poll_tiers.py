@@ -0,0 +1,48 @@
+"""poll_tiers: Blöcke kennen ihre Tiers, read_due liest nur fällige Blöcke."""
+
+import asyncio
+
+from custom_components.ksem import modbus_helper
+from custom_components.ksem.modbus_helper import KsemModbusClient, compile_read_plan
+from custom_components.ksem.modbus_map import DEFAULT_POLL_TIER, SENSOR_DEFINITIONS
+
+
+def test_blocks_record_the_tiers_of_their_values():
+    for block in compile_read_plan(SENSOR_DEFINITIONS):
+        tiers = {
+            SENSOR_DEFINITIONS[block.start + offset].get("poll_tier", DEFAULT_POLL_TIER)
+            for offset in block.offsets
+        }
+        assert block.tiers == tiers
+
+
+def test_read_due_reads_each_register_at_most_once_per_tick(monkeypatch):
+    client = KsemModbusClient("127.0.0.1")
+    polls = []
+
+    async def fake_poll(blocks):
+        polls.append(blocks)
+
+    now = [1000.0]
+    monkeypatch.setattr(client, "_poll", fake_poll)
+    monkeypatch.setattr(modbus_helper.time, "monotonic", lambda: now[0])
+
+    async def run():
+        for _ in range(11):
+            await client.read_due()
+            now[0] += 1
+
+    asyncio.run(run())
+
+    for blocks in polls:
+        registers = [
+            addr
+            for block in blocks
+            for addr in range(block.start, block.start + block.count)
+        ]
+        assert len(registers) == len(set(registers))
+    # erster Tick: alles; danach nur Blöcke mit schnellen Werten
+    assert len(polls[0]) == len(client._plan)
+    assert all("fast" in block.tiers for block in polls[1])
+    # nach 10 s kommen die normalen Blöcke dazu
+    assert any("fast" not in block.tiers for block in polls[10])
@@ -0,0 +1,58 @@
+"""KsemPollScheduler: Versatz der Einträge/Coordinators und globale Begrenzung."""
+
+import asyncio
+
+import pytest
+
+from custom_components.ksem.scheduler import LANES, KsemPollScheduler
+
+
+def test_entries_and_lanes_are_spread_evenly():
+    scheduler = KsemPollScheduler()
+    for entry_id in ("b", "a", "c", "d"):
+        scheduler.register(entry_id)
+    phases = sorted(
+        scheduler.phase(entry_id, lane, 30.0)
+        for entry_id in ("a", "b", "c", "d")
+        for lane in range(LANES)
+    )
+    steps = {round(b - a, 6) for a, b in zip(phases, phases[1:])}
+    assert phases[0] == 0.0
+    assert steps == {2.5}
+
+
+def test_unregistered_entry_has_no_offset():
+    scheduler = KsemPollScheduler()
+    unregister = scheduler.register("a")
+    unregister()
+    assert scheduler.phase("a", 1, 30.0) == 0.0
+
+
+@pytest.mark.parametrize("now", [0.0, 7.3, 29.9, 1000.37])
+def test_next_slot_is_on_grid_and_not_too_early(now):
+    scheduler = KsemPollScheduler()
+    scheduler.register("a")
+    scheduler.register("b")
+    phase = scheduler.phase("b", 0, 30.0)
+    due = scheduler.next_slot("b", 0, 30.0, now)
+    assert (due - phase) % 30.0 == pytest.approx(0.0, abs=1e-6)
+    assert 15.0 <= due - now <= 45.0
+
+
+def test_poll_concurrency_is_limited():
+    async def run():
+        scheduler = KsemPollScheduler(poll_concurrency=2)
+        active = peak = 0
+
+        async def poll():
+            nonlocal active, peak
+            async with scheduler.poll():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.001)
+                active -= 1
+
+        await asyncio.gather(*(poll() for _ in range(6)))
+        return peak, scheduler.waiting
+
+    assert asyncio.run(run()) == (2, 0)
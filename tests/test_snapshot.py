@@ -0,0 +1,65 @@
+"""ModbusSnapshot: Slots, fehlende Werte, Ganzzahlen und Änderungserkennung."""
+
+from custom_components.ksem.modbus_map import SENSOR_DEFINITIONS
+from custom_components.ksem.snapshot import (
+    INT_SLOTS,
+    SLOT_COUNT,
+    SLOTS,
+    ModbusSnapshot,
+    empty_values,
+)
+
+
+def _name(dtype, scaled):
+    return next(
+        spec["name"]
+        for spec in SENSOR_DEFINITIONS.values()
+        if spec["type"] == dtype and (spec.get("scale") not in (None, 1)) == scaled
+    )
+
+
+def test_one_slot_per_definition():
+    assert SLOT_COUNT == len(SENSOR_DEFINITIONS)
+    assert sorted(SLOTS.values()) == list(range(SLOT_COUNT))
+
+
+def test_missing_values_are_not_reported():
+    snapshot = ModbusSnapshot()
+    name = next(iter(SLOTS))
+    assert len(snapshot) == 0
+    assert snapshot.get(name) is None
+    assert snapshot.get(name, 0) == 0
+    assert name not in snapshot
+
+
+def test_unscaled_integers_stay_int():
+    values = empty_values()
+    unscaled = _name("uint16", scaled=False)
+    scaled = _name("uint32", scaled=True)
+    values[SLOTS[unscaled]] = 3
+    values[SLOTS[scaled]] = 12.5
+    snapshot = ModbusSnapshot(values)
+    assert SLOTS[unscaled] in INT_SLOTS
+    assert snapshot[unscaled] == 3 and isinstance(snapshot[unscaled], int)
+    assert snapshot[scaled] == 12.5
+    assert dict(snapshot) == {unscaled: 3, scaled: 12.5}
+
+
+def test_uint64_counter_survives_as_double():
+    # Energiezähler: uint64 mit Skala 0.1 passt bis 2**53 verlustfrei in ein double
+    name = _name("uint64", scaled=True)
+    scale = next(s["scale"] for s in SENSOR_DEFINITIONS.values() if s["name"] == name)
+    raw = 2**45 + 3
+    values = empty_values()
+    values[SLOTS[name]] = raw * scale
+    assert round(ModbusSnapshot(values)[name] / scale) == raw
+
+
+def test_changed_slots_treats_missing_as_equal():
+    old = empty_values()
+    new = empty_values()
+    old[0] = new[0] = 1.0
+    new[1] = 5.0  # neu vorhanden
+    assert ModbusSnapshot(new).changed_slots(ModbusSnapshot(old)) == [1]
+    assert ModbusSnapshot(old) == ModbusSnapshot(old[:])
+    assert ModbusSnapshot(new).changed_slots(None) == list(range(SLOT_COUNT))
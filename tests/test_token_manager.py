@@ -0,0 +1,53 @@
+"""TokenManager: ein Login für alle Aufrufer, Erneuerung nach 401."""
+
+import asyncio
+
+from custom_components.ksem.api import Tokens, TokenManager
+
+
+class FakeLogin:
+    def __init__(self, expires_in=3600):
+        self.calls = 0
+        self.expires_in = expires_in
+
+    async def __call__(self) -> Tokens:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return Tokens(f"token-{self.calls}", "Bearer", self.expires_in)
+
+
+def test_concurrent_callers_share_one_login():
+    async def run():
+        login = FakeLogin()
+        manager = TokenManager(login)
+        tokens = await asyncio.gather(*(manager.async_get() for _ in range(10)))
+        return login.calls, {token.access_token for token in tokens}
+
+    assert asyncio.run(run()) == (1, {"token-1"})
+
+
+def test_invalidate_logs_in_once_per_stale_token():
+    async def run():
+        login = FakeLogin()
+        manager = TokenManager(login)
+        stale = await manager.async_get()
+        renewed = await asyncio.gather(
+            *(manager.async_invalidate(stale) for _ in range(5))
+        )
+        # ein weiterer 401 mit dem alten Token löst keinen Login mehr aus
+        again = await manager.async_invalidate(stale)
+        return login.calls, {t.access_token for t in renewed}, again.access_token
+
+    assert asyncio.run(run()) == (2, {"token-2"}, "token-2")
+
+
+def test_expiring_token_is_refreshed_in_background():
+    async def run():
+        login = FakeLogin(expires_in=30)  # innerhalb der Erneuerungsmarge
+        manager = TokenManager(login)
+        first = await manager.async_get()
+        current = await manager.async_get()  # noch gültig, Refresh startet
+        await asyncio.sleep(0.05)
+        return first.access_token, current.access_token, manager.token.access_token
+
+    assert asyncio.run(run()) == ("token-1", "token-1", "token-2")
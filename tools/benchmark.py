@@ -0,0 +1,363 @@
+"""Reproduzierbarer Benchmark gegen den Fake-KSEM (tools/fake_ksem.py).
+
+Misst Latenz (p50/p90/p99), Requests pro Poll, CPU-Zeit pro Poll und optional
+Allokationen für:
+  - modbus:    KsemModbusClient.read_all()
+  - rest:      ein Polling-Satz der Coordinators (Smartmeter + Wallbox)
+  - websocket: KsemWebSocketHub gegen den Fake (Dispatch-Zeit je Nachricht, Rate)
+  - decode:    Entpacken und Skalieren eines vollständigen Modbus-Snapshots
+               (ohne Netzwerk, Latenz = CPU-Zeit je Snapshot)
+
+    python tools/benchmark.py --polls 200 --latency 0.005 --tracemalloc
+
+Ohne --external wird der Fake-KSEM im selben Prozess gestartet. Benötigt die
+Entwicklungsabhängigkeiten (homeassistant, pymodbus, aiohttp).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "tools"))
+
+from custom_components.ksem.api import KsemClient  # noqa: E402
+from custom_components.ksem.gdr import GDR_PATH, iter_gdrs  # noqa: E402
+from custom_components.ksem.modbus_helper import (  # noqa: E402
+    KsemModbusClient,
+    compile_read_plan,
+    decode_block,
+)
+from custom_components.ksem.modbus_map import SENSOR_DEFINITIONS  # noqa: E402
+from custom_components.ksem.snapshot import empty_values  # noqa: E402
+from custom_components.ksem.websocket import (  # noqa: E402
+    CHARGEMODE_PATH,
+    EVSE_STATE_PATH,
+    KsemWebSocketHub,
+)
+from fake_ksem import PASSWORD, FakeKsem, FaultProfile  # noqa: E402
+
+_LOGGER = logging.getLogger("benchmark")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Perzentil per Nearest-Rank (ausreichend für Benchmarks)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Result:
+    """Sammelt Messwerte eines Szenarios."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: list[float] = []
+        self.cpu: list[float] = []
+        self.requests: list[int] = []
+        self.errors = 0
+        self.alloc_bytes: int | None = None
+        self.alloc_blocks: int | None = None
+        self.extra: dict = {}
+
+    def as_dict(self) -> dict:
+        ms = [v * 1000 for v in self.latencies]
+        result = {
+            "scenario": self.name,
+            "samples": len(ms),
+            "errors": self.errors,
+            "p50_ms": round(percentile(ms, 50), 3),
+            "p90_ms": round(percentile(ms, 90), 3),
+            "p99_ms": round(percentile(ms, 99), 3),
+            "cpu_ms_per_poll": round(statistics.fmean(self.cpu) * 1000, 3)
+            if self.cpu
+            else None,
+            "requests_per_poll": round(statistics.fmean(self.requests), 2)
+            if self.requests
+            else None,
+        }
+        if self.alloc_bytes is not None:
+            result["alloc_bytes_per_poll"] = self.alloc_bytes
+            result["alloc_blocks_per_poll"] = self.alloc_blocks
+        result.update(self.extra)
+        return result
+
+
+async def _measure(result: Result, counter, kind: str, polls: int, poll, alloc: bool):
+    """Führt `poll` wiederholt aus und sammelt Latenz, CPU und Requests."""
+    # Aufwärmen (Verbindung, Token, Lückenerkennung); injizierte Fehler tolerieren
+    for _ in range(5):
+        try:
+            await poll()
+            break
+        except Exception as err:  # noqa: BLE001
+            _LOGGER.debug("%s: Fehler beim Aufwärmen: %s", result.name, err)
+    if alloc:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+    for _ in range(polls):
+        start_req = getattr(counter, kind)
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            await poll()
+        except Exception as err:  # noqa: BLE001 - Benchmark zählt nur Fehler
+            result.errors += 1
+            _LOGGER.debug("%s: Fehler: %s", result.name, err)
+            continue
+        result.latencies.append(time.perf_counter() - start)
+        result.cpu.append(time.process_time() - start_cpu)
+        result.requests.append(getattr(counter, kind) - start_req)
+    if alloc:
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        total = sum(s.size_diff for s in stats if s.size_diff > 0)
+        blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+        result.alloc_bytes = total // max(polls, 1)
+        result.alloc_blocks = blocks // max(polls, 1)
+
+
+async def bench_modbus(args, fake: FakeKsem | None) -> Result:
+    result = Result("modbus")
+    client = KsemModbusClient(
+        args.host, port=args.modbus_port, window=args.window, pool_size=args.pool
+    )
+    await client.connect()
+    try:
+        await _measure(
+            result,
+            fake.counter if fake else _NullCounter(),
+            "modbus",
+            args.polls,
+            client.read_all,
+            args.tracemalloc,
+        )
+        result.extra["pipelined"] = client.pipelined
+        result.extra["bytes_per_poll"] = client.stats.blocks.total_bytes() // max(
+            client.stats.poll.count, 1
+        )
+    finally:
+        await client.disconnect()
+    return result
+
+
+async def bench_rest(args, fake: FakeKsem | None, session) -> Result:
+    result = Result("rest")
+    client = KsemClient(
+        None, f"{args.host}:{args.http_port}", PASSWORD, session=session
+    )
+
+    async def poll():
+        # entspricht einem Zyklus der Smartmeter- und Wallbox-Coordinators
+        evse, *_ = await asyncio.gather(
+            client.get_evse_list(),
+            client.get_device_status(),
+            client.get_phase_switching(),
+            client.get_energyflow_config(),
+            client.get_evse_state(),
+        )
+        await asyncio.gather(*(client.get_evse_details(wb["uuid"]) for wb in evse))
+
+    await _measure(
+        result,
+        fake.counter if fake else _NullCounter(),
+        "http",
+        args.polls,
+        poll,
+        args.tracemalloc,
+    )
+    # ein deviceusage-Abruf je Zyklus (inkl. Aufwärmen)
+    cycles = client.stats.endpoints["GET /api/device-settings/deviceusage"].count
+    result.extra["bytes_per_poll"] = client.stats.summary().bytes // max(cycles, 1)
+    result.extra["reauths"] = client.stats.reauths
+    result.extra["cache_hits"] = client.stats.cache_hits
+    result.extra["not_modified"] = client.stats.not_modified
+    return result
+
+
+class _BenchEntry:
+    """Minimaler Config-Entry für den WebSocket-Hub außerhalb von HA."""
+
+    def async_create_background_task(self, hass, target, name):
+        return asyncio.get_running_loop().create_task(target, name=name)
+
+
+async def bench_websocket(args, session) -> Result:
+    """Betreibt den KsemWebSocketHub für --ws-seconds gegen den Fake.
+
+    Gemessen wird _dispatch des Hubs (Parsen, Topic-Filter, Listener) für die
+    JSON-Streams und den GDR-Stream inkl. Protobuf-Dekodierung.
+    """
+    result = Result("websocket")
+    client = KsemClient(
+        None, f"{args.host}:{args.http_port}", PASSWORD, session=session
+    )
+    hub = KsemWebSocketHub(None, _BenchEntry(), client)
+    dispatch = hub._dispatch
+
+    def timed_dispatch(stream, data):
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        dispatch(stream, data)
+        result.latencies.append(time.perf_counter() - start)
+        result.cpu.append(time.process_time() - start_cpu)
+
+    hub._dispatch = timed_dispatch  # _run ruft _dispatch über die Instanz auf
+    received = dict.fromkeys((CHARGEMODE_PATH, EVSE_STATE_PATH, GDR_PATH), 0)
+
+    def listener(path):
+        def on_message(topic, msg):
+            if path == GDR_PATH:
+                list(iter_gdrs(msg))
+            received[path] += 1
+
+        return on_message
+
+    unsubscribe = [hub.subscribe(path, listener(path)) for path in received]
+    start = time.perf_counter()
+    try:
+        await asyncio.sleep(args.ws_seconds)
+    finally:
+        for unsub in unsubscribe:
+            unsub()
+        await hub.async_stop()
+    elapsed = time.perf_counter() - start
+    total = sum(received.values())
+    result.extra["messages"] = total
+    result.extra["messages_per_s"] = round(total / elapsed, 2) if elapsed else 0
+    result.extra["per_stream"] = received
+    result.extra["reconnects"] = hub.reconnects
+    return result
+
+
+def bench_decode(args) -> Result:
+    """Entpacken/Skalieren aller Blöcke mit festen Nutzdaten, ohne I/O."""
+    result = Result("decode")
+    plan = compile_read_plan(SENSOR_DEFINITIONS)
+    payloads = [bytes(range(256)) * (block.count * 2 // 256 + 1) for block in plan]
+    values = empty_values()
+    if args.tracemalloc:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+    for _ in range(args.polls):
+        start_cpu = time.process_time()
+        start = time.perf_counter()
+        for block, payload in zip(plan, payloads):
+            decode_block(block, payload, values)
+        result.latencies.append(time.perf_counter() - start)
+        result.cpu.append(time.process_time() - start_cpu)
+    if args.tracemalloc:
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        total = sum(s.size_diff for s in stats if s.size_diff > 0)
+        blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+        result.alloc_bytes = total // max(args.polls, 1)
+        result.alloc_blocks = blocks // max(args.polls, 1)
+    result.extra["blocks"] = len(plan)
+    result.extra["values"] = sum(len(block.slots) for block in plan)
+    return result
+
+
+class _NullCounter:
+    """Bei --external gibt es keinen Zugriff auf die Zähler des Servers."""
+
+    http = 0
+    modbus = 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=8080)
+    parser.add_argument("--modbus-port", type=int, default=5020)
+    parser.add_argument("--polls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--sparse", action="store_true")
+    parser.add_argument("--no-pipelining", action="store_true")
+    parser.add_argument("--window", type=int, default=4, help="Modbus-Pipeline-Fenster")
+    parser.add_argument(
+        "--pool", type=int, default=2, help="Modbus-Verbindungen (Fallback)"
+    )
+    parser.add_argument("--ws-seconds", type=float, default=5.0)
+    parser.add_argument("--ws-interval", type=float, default=0.01)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=("modbus", "rest", "websocket", "decode"),
+        help="mehrfach angebbar; Standard: alle",
+    )
+    parser.add_argument(
+        "--tracemalloc", action="store_true", help="Allokationen messen"
+    )
+    parser.add_argument(
+        "--external", action="store_true", help="laufenden Fake/echten KSEM verwenden"
+    )
+    parser.add_argument("--json", action="store_true", help="Ausgabe als JSON")
+    parser.add_argument(
+        "--etag", action="store_true", help="Fake beantwortet bedingte GETs mit 304"
+    )
+    return parser
+
+
+async def run(args) -> list:
+    scenarios = args.scenario or ["modbus", "rest", "websocket", "decode"]
+    fake = None
+    if not args.external:
+        fake = FakeKsem(
+            host=args.host,
+            http_port=args.http_port,
+            modbus_port=args.modbus_port,
+            profile=FaultProfile(args.latency, args.jitter, args.error_rate),
+            sparse=args.sparse,
+            pipelining=not args.no_pipelining,
+            ws_interval=args.ws_interval,
+            etag=args.etag,
+        )
+        await fake.start()
+    results = []
+    try:
+        async with aiohttp.ClientSession() as session:
+            if "modbus" in scenarios:
+                results.append(await bench_modbus(args, fake))
+            if "rest" in scenarios:
+                results.append(await bench_rest(args, fake, session))
+            if "websocket" in scenarios:
+                results.append(await bench_websocket(args, session))
+        if "decode" in scenarios:
+            results.append(bench_decode(args))
+    finally:
+        if fake:
+            await fake.stop()
+    return [r.as_dict() for r in results]
+
+
+def main():
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for res in results:
+        print(f"[{res.pop('scenario')}]")
+        for key, value in res.items():
+            print(f"  {key:24} {value}")
+
+
+if __name__ == "__main__":
+    main()
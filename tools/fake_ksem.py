@@ -0,0 +1,662 @@
+"""Lokaler KSEM-Ersatz für Entwicklung und Benchmarks.
+
+Stellt die REST-/WebSocket-Endpunkte aus api.md (aiohttp) und einen Modbus-TCP-
+Server bereit, dessen Register aus SENSOR_DEFINITIONS befüllt werden.
+Latenz, Jitter und Fehlerquote sind einstellbar; mit --etag beantwortet die
+REST-API bedingte GETs (If-None-Match) mit 304.
+
+    python tools/fake_ksem.py --http-port 8080 --modbus-port 5020 --latency 0.02
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import json
+import logging
+import random
+import struct
+import time
+import uuid
+from pathlib import Path
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger("fake_ksem")
+
+MAP_FILE = Path(__file__).resolve().parents[1] / "custom_components/ksem/modbus_map.py"
+PASSWORD = "test"
+WALLBOX_UUID = "0b6bef8f-c578-4ab3-9ce2-a05418f7fca3"
+
+STRUCT_CODES = {
+    "uint16": "H",
+    "int16": "h",
+    "uint32": "I",
+    "int32": "i",
+    "float32": "f",
+    "uint64": "Q",
+    "int64": "q",
+}
+
+
+def load_sensor_definitions() -> dict:
+    """Lädt modbus_map.py direkt, ohne das HA-Paket zu importieren."""
+    spec = importlib.util.spec_from_file_location("ksem_modbus_map", MAP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SENSOR_DEFINITIONS
+
+
+class FaultProfile:
+    """Latenz, Jitter und Fehlerquote für HTTP und Modbus."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+    async def delay(self):
+        wait = self.latency + random.uniform(0, self.jitter)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+class RequestCounter:
+    """Zählt Requests je Schnittstelle (für 'Requests pro Poll')."""
+
+    def __init__(self):
+        self.http = 0
+        self.modbus = 0
+        self.ws_messages = 0
+
+    def snapshot(self) -> dict:
+        return {"http": self.http, "modbus": self.modbus, "ws": self.ws_messages}
+
+
+# ---------------------------------------------------------------------------
+# Modbus
+# ---------------------------------------------------------------------------
+
+
+def _plausible_value(spec: dict, tick: int) -> float:
+    """Physikalisch plausibler Wert je Einheit; Zähler steigen mit tick."""
+    unit = spec.get("unit") or ""
+    if spec.get("map"):
+        return random.choice(list(spec["map"]))
+    if unit in ("Wh", "varh", "VAh"):
+        return 1_000_000 + tick * random.uniform(0, 50)
+    if unit in ("W", "var", "VA"):
+        return random.uniform(0, 5000)
+    if unit == "V":
+        return random.uniform(225, 235)
+    if unit == "A":
+        return random.uniform(0, 16)
+    if unit == "Hz":
+        return random.uniform(49.95, 50.05)
+    if unit == "unitless":
+        return random.uniform(0.9, 1.0)
+    if unit == "%":
+        return random.uniform(0, 100)
+    return random.randint(0, 3)
+
+
+def encode_registers(spec: dict, value: float) -> list:
+    """Skaliert und kodiert einen Wert in 16-Bit-Register (Big Endian)."""
+    code = STRUCT_CODES[spec["type"]]
+    scale = spec.get("scale") or 1
+    raw = value / scale if code != "f" else value
+    if code != "f":
+        raw = int(raw)
+        if code.isupper():
+            raw = max(raw, 0)
+    data = struct.pack(">" + code, raw)
+    return list(struct.unpack(f">{len(data) // 2}H", data))
+
+
+MBAP_HEADER = struct.Struct(">HHHB")
+REQUEST_PDU = struct.Struct(">BHH")
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+SERVER_DEVICE_FAILURE = 0x04
+
+
+class FakeModbus:
+    """Modbus-TCP-Server (nur FC 0x03), befüllt aus SENSOR_DEFINITIONS.
+
+    Requests werden wie beim KSEM nebenläufig beantwortet (Pipelining); mit
+    pipelining=False verwirft der Server Requests, die während einer laufenden
+    Antwort eintreffen, wie Geräte ohne Pipelining-Unterstützung.
+    """
+
+    def __init__(self, sensor_defs, profile, counter, sparse=False, pipelining=True):
+        self.sensor_defs = sensor_defs
+        self.profile = profile
+        self.counter = counter
+        self.pipelining = pipelining
+        self.registers = [0] * 0x10000
+        self.valid: set[int] | None = None
+        if sparse:
+            # nur definierte Register: Lücken liefern 'Illegal Data Address'
+            self.valid = {
+                addr + i
+                for addr, spec in sensor_defs.items()
+                for i in range(len(encode_registers(spec, 0)))
+            }
+        self.tick = 0
+        self.server: asyncio.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+        self.update()
+
+    def update(self):
+        """Neue Messwerte in die Register schreiben."""
+        self.tick += 1
+        for addr, spec in self.sensor_defs.items():
+            regs = encode_registers(spec, _plausible_value(spec, self.tick))
+            self.registers[addr : addr + len(regs)] = regs
+
+    async def start(self, host: str, port: int):
+        self.server = await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+
+    def _response(self, unit: int, fc: int, address: int, count: int) -> bytes:
+        if fc != 0x03:
+            return bytes((fc | 0x80, ILLEGAL_FUNCTION))
+        if not 1 <= count <= 125 or address + count > 0x10000:
+            return bytes((fc | 0x80, ILLEGAL_DATA_ADDRESS))
+        if self.valid is not None and any(
+            a not in self.valid for a in range(address, address + count)
+        ):
+            return bytes((fc | 0x80, ILLEGAL_DATA_ADDRESS))
+        if self.profile.fail():
+            return bytes((fc | 0x80, SERVER_DEVICE_FAILURE))
+        regs = self.registers[address : address + count]
+        return struct.pack(f">BB{count}H", fc, count * 2, *regs)
+
+    async def _handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        busy = asyncio.Lock()
+
+        async def respond(tid, unit, fc, address, count):
+            await self.profile.delay()
+            pdu = self._response(unit, fc, address, count)
+            writer.write(MBAP_HEADER.pack(tid, 0, len(pdu) + 1, unit) + pdu)
+
+        async def respond_serial(*args):
+            async with busy:
+                await respond(*args)
+
+        tasks = set()
+        try:
+            while True:
+                tid, _, length, unit = MBAP_HEADER.unpack(
+                    await reader.readexactly(MBAP_HEADER.size)
+                )
+                pdu = await reader.readexactly(length - 1)
+                self.counter.modbus += 1
+                if len(pdu) != REQUEST_PDU.size:
+                    continue
+                args = (tid, unit, *REQUEST_PDU.unpack(pdu))
+                if self.pipelining:
+                    task = asyncio.create_task(respond(*args))
+                elif busy.locked():
+                    continue  # Gerät ohne Pipelining: Request geht verloren
+                else:
+                    task = asyncio.create_task(respond_serial(*args))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            self._handlers.discard(handler)
+
+
+# ---------------------------------------------------------------------------
+# REST / WebSocket
+# ---------------------------------------------------------------------------
+
+
+class FakeKsemApi:
+    """aiohttp-App mit den Endpunkten aus api.md."""
+
+    def __init__(
+        self, profile, counter, token_lifetime=3600, ws_interval=1.0, etag=False
+    ):
+        self.profile = profile
+        self.etag = etag
+        self.counter = counter
+        self.token_lifetime = token_lifetime
+        self.ws_interval = ws_interval
+        self.tokens: set[str] = set()
+        self.chargemode = {
+            "mode": "lock",
+            "mincharginpowerquota": 0,
+            "minpvpowerquota": 0,
+            "lastminchargingpowerquota": 100,
+            "lastminpvpowerquota": 30,
+            "controlledby": 0,
+        }
+        self.phase_usage = 0
+        self.batteryusage = True
+        self.evse_state = "stateConnected"
+        self._sockets: set[web.WebSocketResponse] = set()
+        self.app = web.Application(middlewares=[self._middleware])
+        self._routes()
+
+    # -- Infrastruktur ------------------------------------------------------
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        self.counter.http += 1
+        await self.profile.delay()
+        if request.path != "/api/web-login/token":
+            auth = request.headers.get("Authorization", "")
+            if auth.removeprefix("Bearer ") not in self.tokens:
+                return web.json_response({"error": "unauthorized"}, status=401)
+            if self.profile.fail():
+                return web.json_response({"error": "injected"}, status=500)
+        response = await handler(request)
+        if self.etag and request.method == "GET" and response.status == 200:
+            body = getattr(response, "body", None)
+            if isinstance(body, bytes):
+                tag = f'"{hashlib.md5(body).hexdigest()}"'
+                if request.headers.get("If-None-Match") == tag:
+                    return web.Response(status=304, headers={"ETag": tag})
+                response.headers["ETag"] = tag
+        return response
+
+    def _routes(self):
+        r = self.app.router
+        r.add_post("/api/web-login/token", self.login)
+        r.add_get("/api/device-settings", self.device_settings)
+        r.add_get("/api/device-settings/deviceusage", self.device_usage)
+        r.add_get("/api/device-settings/devicestatus", self.static({"status": "idle"}))
+        r.add_get("/api/e-mobility/evselist", self.evse_list)
+        r.add_get("/api/evse-kostal/evse/{uuid}/details", self.evse_details)
+        r.add_get("/api/e-mobility/state", self.emobility_state)
+        r.add_get("/api/e-mobility/config/phaseswitching", self.get_phase)
+        r.add_put("/api/e-mobility/config/phaseswitching", self.put_phase)
+        r.add_put("/api/e-mobility/config/chargemode", self.put_chargemode)
+        r.add_get("/api/kostal-energyflow/configuration", self.energyflow)
+        r.add_put(
+            "/api/kostal-energyflow/configuration/batteryusage", self.put_batteryusage
+        )
+        r.add_get("/api/data-transfer/ws/{tail:.*}", self.websocket)
+
+    @staticmethod
+    def static(payload):
+        async def handler(request):
+            return web.json_response(payload)
+
+        return handler
+
+    # -- REST ---------------------------------------------------------------
+
+    async def login(self, request):
+        form = await request.post()
+        if form.get("password") != PASSWORD:
+            return web.json_response({"error": "invalid_grant"})
+        token = uuid.uuid4().hex
+        self.tokens.add(token)
+        return web.json_response(
+            {
+                "access_token": token,
+                "token_type": "Bearer",
+                "expires_in": self.token_lifetime,
+            }
+        )
+
+    async def device_settings(self, request):
+        return web.json_response(
+            {
+                "Mac": "AA:BB:CC:DD:EE:FF",
+                "Serial": "FAKE0001",
+                "ProductName": "KOSTAL Smart Energy Meter",
+                "DeviceType": "hw0100",
+                "FirmwareVersion": "2.6.2",
+                "hostname": "fake-ksem",
+            }
+        )
+
+    async def device_usage(self, request):
+        return web.json_response(
+            {
+                "CpuLoad": random.randint(5, 90),
+                "CpuTemp": random.randint(50, 80),
+                "RamFree": 138064,
+                "RamTotal": 248432,
+                "FlashAppFree": 231806976,
+                "FlashAppTotal": 249469952,
+                "FlashDataFree": 1207975936,
+                "FlashDataTotal": 1300037632,
+            }
+        )
+
+    async def evse_list(self, request):
+        return web.json_response(
+            [
+                {
+                    "label": "Wallbox",
+                    "uuid": WALLBOX_UUID,
+                    "parent_uuid": WALLBOX_UUID,
+                    "topic": "gdr/local/config/kostal/evse",
+                    "manufacturer": "kostal",
+                    "state": self.evse_state,
+                    "model": "ac-3_7_11",
+                    "supports_phase_switching": True,
+                }
+            ]
+        )
+
+    async def evse_details(self, request):
+        return web.json_response(
+            {
+                "serial": "FAKEWB01",
+                "model": "ac-3_7_11",
+                "version": "FW: 2023.21.11024-20; COM: 1.03",
+                "hardware": "0003",
+                "max_install_current": 63000,
+                "updateable": True,
+                "phase_switching_option": 2,
+                "supports_phase_switching": True,
+            }
+        )
+
+    async def emobility_state(self, request):
+        power = random.randint(0, 11000) * 1000
+        return web.json_response(
+            {
+                "EvChargingPower": {
+                    "total": power,
+                    "l1": power // 3,
+                    "l2": power // 3,
+                    "l3": power // 3,
+                },
+                "CurtailmentSetpoint": {
+                    "total": 48000,
+                    "l1": 16000,
+                    "l2": 16000,
+                    "l3": 16000,
+                },
+                "OverloadProtectionActive": True,
+                "GridPowerLimit": {"Active": False, "Power": 0},
+                "PVPowerLimit": {"Active": False, "Power": 0},
+            }
+        )
+
+    async def get_phase(self, request):
+        return web.json_response({"phase_usage": self.phase_usage})
+
+    async def put_phase(self, request):
+        self.phase_usage = (await request.json())["phase_usage"]
+        return web.Response(status=200)
+
+    async def put_chargemode(self, request):
+        self.chargemode.update(await request.json())
+        await self.broadcast("json/local/config/e-mobility/chargemode", self.chargemode)
+        return web.Response(status=204)
+
+    async def energyflow(self, request):
+        return web.json_response(
+            {
+                "enabled": False,
+                "selected_controller_type": "legacy",
+                "batteryusage": self.batteryusage,
+                "version": 5,
+            }
+        )
+
+    async def put_batteryusage(self, request):
+        self.batteryusage = (await request.text()).strip() == "true"
+        return web.Response(status=204)
+
+    # -- WebSocket ----------------------------------------------------------
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        first = await ws.receive()
+        if (
+            first.type != WSMsgType.TEXT
+            or first.data.removeprefix("Bearer ") not in self.tokens
+        ):
+            await ws.close(code=4001, message=b"unauthorized")
+            return ws
+        ws.ksem_topic = request.match_info["tail"]
+        self._sockets.add(ws)
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self._sockets.discard(ws)
+        return ws
+
+    async def broadcast(self, topic: str, msg: dict):
+        data = json.dumps({"topic": topic, "msg": msg})
+        for ws in list(self._sockets):
+            if ws.ksem_topic.startswith("json/json/") and _topic_matches(
+                ws.ksem_topic.removeprefix("json/json/"), topic.removeprefix("json/")
+            ):
+                self.counter.ws_messages += 1
+                await ws.send_str(data)
+
+    async def broadcast_gdr(self):
+        """Sendet ein GDRs-Frame an alle Protobuf-Abonnenten."""
+        sockets = [
+            ws for ws in self._sockets if ws.ksem_topic.startswith("protobuf/gdr/")
+        ]
+        if not sockets:
+            return
+        frame = encode_gdrs(
+            {
+                WALLBOX_UUID: {
+                    "1-0:32.4.0*255": random.randint(225, 235),
+                    "1-0:52.4.0*255": random.randint(225, 235),
+                    "1-0:72.4.0*255": random.randint(225, 235),
+                    "1-0:31.4.0*255": random.randint(0, 16),
+                    "1-0:51.4.0*255": random.randint(0, 16),
+                    "1-0:71.4.0*255": random.randint(0, 16),
+                    "1-0:1.4.0*255": random.randint(0, 11000),
+                }
+            }
+        )
+        for ws in sockets:
+            self.counter.ws_messages += 1
+            await ws.send_bytes(frame)
+
+    async def push_loop(self):
+        """Sendet zyklisch Charge-Mode-, State- und GDR-Nachrichten."""
+        while True:
+            await asyncio.sleep(self.ws_interval)
+            await self.broadcast_gdr()
+            self.chargemode["minpvpowerquota"] = random.choice((0, 10, 20, 30))
+            await self.broadcast(
+                "json/local/config/e-mobility/chargemode", self.chargemode
+            )
+            self.evse_state = random.choice(("stateConnected", "stateCharging"))
+            await self.broadcast(
+                f"json/local/evse/{WALLBOX_UUID}/state",
+                {"evse-id": WALLBOX_UUID, "parentState": "", "state": self.evse_state},
+            )
+
+
+def _pb_varint(value: int) -> bytes:
+    value &= (1 << 64) - 1
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _pb_len(field: int, payload: bytes) -> bytes:
+    return _pb_varint(field << 3 | 2) + _pb_varint(len(payload)) + payload
+
+
+def _pb_int(field: int, value: int) -> bytes:
+    return _pb_varint(field << 3) + _pb_varint(value)
+
+
+def encode_gdrs(gdrs: dict) -> bytes:
+    """Kodiert {uuid: {obis: wert}} als GDRs-Protobuf (Aufbau wie in api.md)."""
+    frame = b""
+    for device_id, values in gdrs.items():
+        gdr = (
+            _pb_len(1, device_id.encode())
+            + _pb_int(2, 1)
+            + _pb_int(3, int(time.time()))
+        )
+        for obis, value in values.items():
+            gdr += _pb_len(4, _pb_len(1, obis.encode()) + _pb_int(2, value))
+        frame += _pb_len(1, _pb_len(1, device_id.encode()) + _pb_len(2, gdr))
+    return frame
+
+
+def _topic_matches(pattern: str, topic: str) -> bool:
+    """MQTT-artiger Vergleich mit '+' als Platzhalter für eine Ebene."""
+    p_parts = pattern.split("/")
+    t_parts = topic.split("/")
+    if len(p_parts) != len(t_parts):
+        return False
+    return all(p in ("+", t) for p, t in zip(p_parts, t_parts))
+
+
+# ---------------------------------------------------------------------------
+# Gesamter Fake-KSEM
+# ---------------------------------------------------------------------------
+
+
+class FakeKsem:
+    """REST/WebSocket + Modbus in einem Objekt, für Benchmarks im selben Prozess."""
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        http_port=8080,
+        modbus_port=5020,
+        profile: FaultProfile | None = None,
+        sparse=False,
+        pipelining=True,
+        ws_interval=1.0,
+        update_interval=1.0,
+        etag=False,
+    ):
+        self.host = host
+        self.http_port = http_port
+        self.modbus_port = modbus_port
+        self.profile = profile or FaultProfile()
+        self.counter = RequestCounter()
+        self.update_interval = update_interval
+        self.api = FakeKsemApi(
+            self.profile, self.counter, ws_interval=ws_interval, etag=etag
+        )
+        self.modbus = FakeModbus(
+            load_sensor_definitions(),
+            self.profile,
+            self.counter,
+            sparse=sparse,
+            pipelining=pipelining,
+        )
+        self._runner: web.AppRunner | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._runner = web.AppRunner(self.api.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.http_port).start()
+        await self.modbus.start(self.host, self.modbus_port)
+        loop = asyncio.get_running_loop()
+        self._tasks = [
+            loop.create_task(self.api.push_loop()),
+            loop.create_task(self._update_loop()),
+        ]
+        _LOGGER.info(
+            "Fake-KSEM läuft: http://%s:%s, Modbus %s:%s",
+            self.host,
+            self.http_port,
+            self.host,
+            self.modbus_port,
+        )
+
+    async def _update_loop(self):
+        while True:
+            await asyncio.sleep(self.update_interval)
+            self.modbus.update()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await self.modbus.stop()
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--http-port", type=int, default=8080)
+    parser.add_argument("--modbus-port", type=int, default=5020)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Sekunden je Request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="zusätzlich 0..jitter s"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Anteil 0..1")
+    parser.add_argument(
+        "--sparse", action="store_true", help="Registerlücken liefern Illegal Address"
+    )
+    parser.add_argument(
+        "--no-pipelining",
+        action="store_true",
+        help="Modbus-Requests während einer Antwort verwerfen",
+    )
+    parser.add_argument("--ws-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--etag",
+        action="store_true",
+        help="ETag senden, If-None-Match mit 304 beantworten",
+    )
+    return parser
+
+
+async def _main(args):
+    fake = FakeKsem(
+        host=args.host,
+        http_port=args.http_port,
+        modbus_port=args.modbus_port,
+        profile=FaultProfile(args.latency, args.jitter, args.error_rate),
+        sparse=args.sparse,
+        pipelining=not args.no_pipelining,
+        ws_interval=args.ws_interval,
+        etag=args.etag,
+    )
+    await fake.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(build_parser().parse_args()))
+    except KeyboardInterrupt:
+        pass